@@ -1,7 +1,10 @@
-from utils import read_file
-from typing import List, Dict
+from utils import read_file, sum_by_line
+from typing import Iterable, List, Dict
 import re
 
+DIGITS = {'1': '1', '2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8', '9': '9'}
+SPELLED_DIGITS = {**DIGITS, 'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
+                  'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'}
 
 class CalibrationDocument:
     def __init__(self, lines: List[str], digits: Dict):
@@ -34,16 +37,25 @@ class Line:
         return int(self.digits[self.first_digit] + self.digits[self.last_digit])
 
 
-if __name__ == '__main__':
-    filename = 'input/Day1.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[str]:
+    return data
+
+
+def part1(lines: List[str]) -> int:
+    return CalibrationDocument(lines, DIGITS).calibration_value
+
 
-    valid_digits = {'1': '1', '2': '2', '3': '3', '4': '4', '5': '5', '6': '6', '7': '7', '8': '8', '9': '9'}
-    doc = CalibrationDocument(data, valid_digits)
-    print(f"The answer to part 1 is {doc.calibration_value}")
+def part2(lines: List[str]) -> int:
+    return CalibrationDocument(lines, SPELLED_DIGITS).calibration_value
 
-    valid_digits.update({'one': '1', 'two': '2', 'three': '3', 'four': '4', 'five': '5',
-                         'six': '6', 'seven': '7', 'eight': '8', 'nine': '9'})
-    doc = CalibrationDocument(data, valid_digits)
-    print(f"The answer to part 2 is {doc.calibration_value}")
 
+def stream(lines: Iterable[str]) -> List[int]:
+    return sum_by_line(lines, parse_input, [part1, part2])
+
+
+if __name__ == '__main__':
+    filename = 'input/Day1.txt'
+    data = parse_input(read_file(filename))
+
+    print(f"The answer to part 1 is {part1(data)}")
+    print(f"The answer to part 2 is {part2(data)}")
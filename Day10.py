@@ -1,7 +1,9 @@
-from utils import read_file, Part
+from __future__ import annotations
+
+from utils import read_file, Grid, Part, lazy_import
 from typing import List
-import pandas as pd
-import numpy as np
+
+np = lazy_import('numpy')
 
 
 pipe_types = {
@@ -24,9 +26,9 @@ directions = {
 
 class Sketch:
     def __init__(self, data: List[str]):
-        self.grid = pd.DataFrame([[c for c in line] for line in data])
+        self.grid = Grid.from_lines(data)
         self.max_x, self.max_y = self.grid.shape
-        row, col = (self.grid == 'S').stack().idxmax()
+        row, col = self.grid.find('S')
         pipe_type = self.get_starting_pipe_type(row, col)
         openings = np.copy(pipe_types[pipe_type])
         # This will have two openings so close one so that we know which way to go
@@ -35,34 +37,34 @@ class Sketch:
         self.loop.build(None)
 
         # Below is for Part 2
-        self.grid.iloc[row, col] = pipe_type
-        self.is_in_loop = pd.DataFrame(np.full((self.max_x, self.max_y), False, dtype=bool))
+        self.grid[row, col] = ord(pipe_type)
+        self.is_in_loop = np.full(self.grid.shape, False, dtype=bool)
         # traverse the loop
         while self.loop.current.next != self.loop.head:
-            self.is_in_loop.iloc[self.loop.current.row, self.loop.current.col] = True
+            self.is_in_loop[self.loop.current.row, self.loop.current.col] = True
             self.loop.current = self.loop.current.next
-        self.is_in_loop.iloc[self.loop.current.row, self.loop.current.col] = True
+        self.is_in_loop[self.loop.current.row, self.loop.current.col] = True
         self.loop.current = self.loop.current.next
-        self.revised_grid = self.grid.where(self.is_in_loop, '.')
+        self.revised_grid = Grid(np.where(self.is_in_loop, self.grid.cells, ord('.')))
         self.final_grid = self.revised_grid.copy()
-        for row_index, row in self.revised_grid.iterrows():
+        for row_index in range(self.max_x):
             on_edge = True
-            for col_index, value in enumerate(list(row)):
-                if value != '.':
+            for col_index in range(self.max_y):
+                if self.revised_grid[row_index, col_index] != ord('.'):
                     on_edge = False
                 else:
                     if on_edge:
-                        self.final_grid.at[row_index, col_index] = 'O'
+                        self.final_grid[row_index, col_index] = ord('O')
                     else:
                         new_value = self.is_inside_or_outside(row_index, col_index)
-                        self.final_grid.at[row_index, col_index] = new_value
+                        self.final_grid[row_index, col_index] = ord(new_value)
 
     def answer_pt2(self):
-        return (self.final_grid == '*').sum().sum()
+        return int(np.count_nonzero(self.final_grid.cells == ord('*')))
 
     def is_inside_or_outside(self, row: int, col: int):
         # we can look in any direction but we'll look to the right
-        ray = "".join([ele.replace('\n', '') for ele in list(self.revised_grid.iloc[row, col + 1:])])
+        ray = self.revised_grid[row, col + 1:].tobytes().decode()
         ray = ray.replace('-', '').\
             replace('.', '').\
             replace('LJ', '').\
@@ -74,16 +76,16 @@ class Sketch:
     def get_starting_pipe_type(self, row: int, col: int) -> str:
         openings = np.array([0, 0, 0, 0])
 
-        if row > 0 and self.grid.iloc[row - 1, col] in ['|', '7', 'F']:
+        if row > 0 and self.grid.char((row - 1, col)) in ['|', '7', 'F']:
             # we can move north
             openings[0] = 1
-        if col < self.max_y - 1 and self.grid.iloc[row, col + 1] in ['-', '7', 'J']:
+        if col < self.max_y - 1 and self.grid.char((row, col + 1)) in ['-', '7', 'J']:
             # we can move east
             openings[1] = 1
-        if row < self.max_x - 1 and self.grid.iloc[row + 1, col] in ['|', 'L', 'J']:
+        if row < self.max_x - 1 and self.grid.char((row + 1, col)) in ['|', 'L', 'J']:
             # we can move south
             openings[2] = 1
-        if col > 0 and self.grid.iloc[row, col - 1] in ['-', 'L', 'F']:
+        if col > 0 and self.grid.char((row, col - 1)) in ['-', 'L', 'F']:
             # we can move west
             openings[3] = 1
 
@@ -100,7 +102,7 @@ class Pipe:
 
 
 class Loop:
-    def __init__(self, grid: pd.DataFrame, head: Pipe):
+    def __init__(self, grid: Grid, head: Pipe):
         self.grid = grid
         self.head = head
         self.current = head
@@ -110,25 +112,25 @@ class Loop:
         while symbol != 'S':
             if np.array_equal(self.current.openings, directions['NORTH']):
                 row, col = self.current.row - 1, self.current.col
-                symbol = self.grid.iloc[row, col]
+                symbol = self.grid.char((row, col))
                 # block off south for next node
                 openings = np.array([1, 1, 0, 1]) & np.copy(pipe_types.get(
                     self.head.pipe_type if symbol == 'S' else symbol))
             elif np.array_equal(self.current.openings, directions['EAST']):
                 row, col = self.current.row, self.current.col + 1
-                symbol = self.grid.iloc[row, col]
+                symbol = self.grid.char((row, col))
                 # block off west for next node
                 openings = np.array([1, 1, 1, 0]) & np.copy(pipe_types.get(
                     self.head.pipe_type if symbol == 'S' else symbol))
             elif np.array_equal(self.current.openings, directions['SOUTH']):
                 row, col = self.current.row + 1, self.current.col
-                symbol = self.grid.iloc[row, col]
+                symbol = self.grid.char((row, col))
                 # block off north for next node
                 openings = np.array([0, 1, 1, 1]) & np.copy(pipe_types.get(
                     self.head.pipe_type if symbol == 'S' else symbol))
             else:
                 row, col = self.current.row, self.current.col - 1
-                symbol = self.grid.iloc[row, col]
+                symbol = self.grid.char((row, col))
                 # block off east for next node
                 openings = np.array([1, 0, 1, 1]) & np.copy(pipe_types.get(
                     self.head.pipe_type if symbol == 'S' else symbol))
@@ -142,11 +144,22 @@ class Loop:
             self.num_pipes += 1
 
 
+def parse_input(data: List[str]) -> Sketch:
+    return Sketch(data)
+
+
+def part1(sketch: Sketch) -> int:
+    return sketch.loop.num_pipes // 2
+
+
+def part2(sketch: Sketch) -> int:
+    return sketch.answer_pt2()
+
+
 if __name__ == '__main__':
     filename = 'input/Day10.txt'
-    data = read_file(filename)
-    sketch = Sketch(data)
+    sketch = parse_input(read_file(filename))
 
-    print(f"The answer to part 1 is {sketch.loop.num_pipes // 2}.")
+    print(f"The answer to part 1 is {part1(sketch)}.")
 
-    print(f"The answer to part 2 is {sketch.answer_pt2()}.")
+    print(f"The answer to part 2 is {part2(sketch)}.")
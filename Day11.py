@@ -36,12 +36,22 @@ class Image:
         return distance
 
 
+def parse_input(data: List[str]) -> List[str]:
+    return data
+
+
+def part1(data: List[str]) -> int:
+    return sum(list(Image(data, 1).pairs.values()))
+
+
+def part2(data: List[str]) -> int:
+    return sum(list(Image(data, 999_999).pairs.values()))
+
+
 if __name__ == '__main__':
     filename = 'input/Day11.txt'
-    data = read_file(filename)
+    data = parse_input(read_file(filename))
 
-    image = Image(data, 1)
-    print(f"The answer to part 1 is {sum(list(image.pairs.values()))}.")
+    print(f"The answer to part 1 is {part1(data)}.")
 
-    image = Image(data, 999_999)
-    print(f"The answer to part 2 is {sum(list(image.pairs.values()))}.")
+    print(f"The answer to part 2 is {part2(data)}.")
@@ -1,7 +1,8 @@
-from utils import read_file
-import re
-from typing import List
-from functools import lru_cache
+from __future__ import annotations
+
+from utils import read_file, sum_by_line
+from arrangements import count_arrangements, count_batch
+from typing import Iterable, List, Tuple
 
 
 NUM_FOLDS = 5
@@ -11,54 +12,43 @@ class Record:
     def __init__(self, springs: str, groups_to_find: List[int]):
         self.springs = springs
         self.groups_to_find = groups_to_find
-        self.pattern = re.compile(self.get_pattern())
-        self.multiple_dots = re.compile(r'\.+')
-
-    def get_pattern(self) -> str:
-        pound_signs = ["".join(['#' for _ in range(group)]) for group in self.groups_to_find]
-        pattern = "^[.]*"
-        for pound_sign in pound_signs:
-            pattern += pound_sign + "[.]+"
-        pattern = pattern[:-1] + '*'
-        pattern += "$"
-        return pattern
-
-    @lru_cache
-    def find_matches(self, string: str):
-        # If we have a complete string check if it matches
-        if string.find('?') == -1:
-            if self.pattern.match(string):
-                return 1
-            else:
-                return 0
-
-        # First check we don't have too many groups
-        groups = [group for group in self.multiple_dots.split(string) if group != ""]
-        definite_groups = [group for group in groups if '#' in group]
-        if len(definite_groups) > len(self.groups_to_find):
-            return 0
-
-        # Now check that the groups we have so far match
-        known_groups = re.findall('#+', string[:string.find('?')])
-        if known_groups:
-            if len(known_groups[-1]) > self.groups_to_find[len(known_groups)-1]:
-                return 0
-        results = 0
-        for char in ['#', '.']:
-            new_str = string.replace('?', char, 1)
-            results += self.find_matches(new_str)
-        return results
 
+    def find_matches(self, backend: str = 'dp') -> int:
+        return count_arrangements(self.springs, tuple(self.groups_to_find), backend)
+
+    def unfold(self) -> Record:
+        return Record("?".join([self.springs] * NUM_FOLDS), self.groups_to_find * NUM_FOLDS)
+
+    def pair(self) -> Tuple[str, Tuple[int, ...]]:
+        return self.springs, tuple(self.groups_to_find)
 
-if __name__ == '__main__':
-    filename = 'input/Day12.txt'
-    data = read_file(filename)
 
+def parse_input(data: List[str]) -> List[Record]:
     records = []
     for line in data:
         pts = line.split(' ')
         springs = pts[0]
         groups_to_find = [int(ele) for ele in pts[1].split(',')]
         records.append(Record(springs, groups_to_find))
-    matches = [record.find_matches(record.springs) for record in records]
-    print(f"The answer to part 1 is {sum(matches)}.")
+    return records
+
+
+def part1(records: List[Record], workers: int = None) -> int:
+    return sum(count_batch([record.pair() for record in records], workers=workers))
+
+
+def part2(records: List[Record], workers: int = None) -> int:
+    return sum(count_batch([record.unfold().pair() for record in records], workers=workers))
+
+
+def stream(lines: Iterable[str]) -> List[int]:
+    return sum_by_line(lines, parse_input, [part1, part2])
+
+
+if __name__ == '__main__':
+    filename = 'input/Day12.txt'
+    records = parse_input(read_file(filename))
+
+    print(f"The answer to part 1 is {part1(records)}.")
+
+    print(f"The answer to part 2 is {part2(records)}.")
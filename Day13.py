@@ -1,10 +1,13 @@
-from utils import read_file
+from __future__ import annotations
+
+from utils import read_file, char_grid, Grid, lazy_import
 from typing import List
-import numpy as np
 from enum import Enum, auto
 
+np = lazy_import('numpy')
+
 
-def parse_input(data: List[str]):
+def parse_input(data: List[str]) -> List[Grid]:
     empty_list_indices = [i for i, sublist in enumerate(data) if not sublist]
     ind = 0
     grids = []
@@ -13,11 +16,7 @@ def parse_input(data: List[str]):
         ind = i + 1
     grids.append(data[ind:])
 
-    grid_arrays = []
-    for grid in grids:
-        grid_arrays.append(np.array([[1 if ele == '#' else 0 for ele in line] for line in grid]))
-
-    return grid_arrays
+    return [Grid(char_grid(grid) == ord('#')) for grid in grids]
 
 
 class Direction(str, Enum):
@@ -26,12 +25,12 @@ class Direction(str, Enum):
 
 
 class Pattern:
-    def __init__(self, pattern: np.array, parent=None):
-        self.pattern = pattern
+    def __init__(self, grid: Grid, parent=None):
+        self.pattern = grid.cells
         self.parent = parent
         self.cleaned_patterns = []
         self.horizontals = self.find_relected_lines(self.pattern)
-        self.verticals = self.find_relected_lines(np.rot90(self.pattern, k=3))
+        self.verticals = self.find_relected_lines(grid.rotated(k=3).cells)
 
     def update_array(self, arr1: np.array, arr2: np.array):
         ind = np.where(arr1 != arr2)[0][0]
@@ -58,7 +57,7 @@ class Pattern:
         for pattern in self.cleaned_patterns:
             if np.array_equal(pattern.pattern, cleaned_pattern):
                 return
-        child = Pattern(cleaned_pattern, parent=self)
+        child = Pattern(Grid(cleaned_pattern), parent=self)
         self.cleaned_patterns.append(child)
 
     @property
@@ -104,19 +103,23 @@ class Pattern:
         return lines_of_reflections
 
 
-if __name__ == '__main__':
-    filename = 'input/Day13.txt'
-    data = read_file(filename)
-    grids = parse_input(data)
-
+def part1(grids: List[Grid]) -> int:
     patterns = [Pattern(grid) for grid in grids]
-    print(f"The answer to part 1 is {sum([pattern.score for pattern in patterns])}.")
+    return sum([pattern.score for pattern in patterns])
+
 
+def part2(grids: List[Grid]) -> int:
+    patterns = [Pattern(grid) for grid in grids]
     [pattern.add_cleaned_patterns(Direction.HORIZONTAL) for pattern in patterns]
     [pattern.add_cleaned_patterns(Direction.VERTICAL) for pattern in patterns]
+    return sum(cleaned_pattern.score for pattern in patterns for cleaned_pattern in pattern.cleaned_patterns)
 
-    print(f"The answer to part 2 is "
-          f"{sum(cleaned_pattern.score for pattern in patterns for cleaned_pattern in pattern.cleaned_patterns)}.")
 
+if __name__ == '__main__':
+    filename = 'input/Day13.txt'
+    data = read_file(filename)
+    grids = parse_input(data)
 
+    print(f"The answer to part 1 is {part1(grids)}.")
 
+    print(f"The answer to part 2 is {part2(grids)}.")
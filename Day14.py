@@ -1,35 +1,136 @@
-from utils import read_file, MapDirection
-import numpy as np
+from __future__ import annotations
+
+from utils import read_input, Grid, MapDirection, lazy_import
 import hashlib
+from typing import List
+
+np = lazy_import('numpy')
 
 NUM_CYCLES = 1000000000
 
 
+ROUND = ord('O')
+CUBE = ord('#')
+EMPTY = ord('.')
+
+
+# Looking along each direction with the rocks rolling towards the start of
+# axis 0. These are all views, so nothing gets copied.
+ORIENTATIONS = {MapDirection.NORTH: lambda a: a,
+                MapDirection.WEST: lambda a: a.T,
+                MapDirection.SOUTH: lambda a: a[::-1],
+                MapDirection.EAST: lambda a: a.T[::-1]}
+SPIN = [MapDirection.NORTH, MapDirection.WEST, MapDirection.SOUTH, MapDirection.EAST]
+
+
+class TiltEngine:
+    # Cubes never move, so everything about them is worked out once. For each
+    # direction every cell gets the segment (the run of cells between two
+    # cubes along the roll) it is in and its rank, how far it is from the end
+    # of the segment the rocks roll to. A tilt then counts the round rocks in
+    # each segment and keeps the cells whose rank is below their count.
+    def __init__(self, cubes: np.ndarray):
+        self.shape = cubes.shape
+        self.segments, self.ranks, self.num_segments = {}, {}, {}
+        for d, orient in ORIENTATIONS.items():
+            view = orient(cubes)
+            length, lines = view.shape
+            index = np.arange(length)[:, None]
+            # The first cell of each segment is the one after the last cube
+            first = np.maximum.accumulate(np.where(view, index + 1, 0), axis=0)
+            segments, ranks = np.empty(self.shape, dtype=np.intp), np.empty(self.shape, dtype=np.intp)
+            orient(segments)[:] = first + np.arange(lines) * (length + 1)
+            # Nothing ever lands on a cube
+            orient(ranks)[:] = np.where(view, length, index - first)
+            self.segments[d], self.ranks[d] = segments.ravel(), ranks.ravel()
+            self.num_segments[d] = lines * (length + 1)
+        self.weights = np.repeat(np.arange(self.shape[0], 0, -1), self.shape[1])
+
+    def tilt(self, rounds: np.ndarray, d: MapDirection) -> np.ndarray:
+        # rounds is a flat mask of the round rocks; a new one comes back
+        counts = np.bincount(self.segments[d][rounds], minlength=self.num_segments[d])
+        return self.ranks[d] < counts[self.segments[d]]
+
+    def spin(self, rounds: np.ndarray) -> np.ndarray:
+        for d in SPIN:
+            rounds = self.tilt(rounds, d)
+        return rounds
+
+    def load(self, rounds: np.ndarray) -> int:
+        return int(self.weights[rounds].sum())
+
+
 class Platform:
-    def __init__(self, grid: np.array):
-        self.grid = grid
-        # We know grid is square (cheat!)
-        self.size = grid.shape[0]
-        self.grid_history = [(0, self.grid, self.load)]
+    def __init__(self, grid: Grid):
+        self.cubes = grid.cells == CUBE
+        self.engine = TiltEngine(self.cubes)
+        self.rounds = (grid.cells == ROUND).ravel()
+
+    @property
+    def grid(self) -> Grid:
+        cells = np.where(self.cubes, CUBE, EMPTY).astype(np.uint8)
+        cells[self.rounds.reshape(self.engine.shape)] = ROUND
+        return Grid(cells)
 
     @property
     def load(self):
-        return sum(sum(self.grid[i, :] == 0) * (self.size - i) for i in range(self.size))
-
-    def cycle(self, n=1):
-        i = 1
-        while i < n + 1:
-            for direction in [MapDirection.NORTH, MapDirection.WEST,
-                              MapDirection.SOUTH, MapDirection.EAST]:
-                self.tilt(direction)
-
-            for prev in range(i):
-                if np.array_equal(self.grid_history[prev][1], self.grid):
-                    cycle = i - prev
-                    ind = (n - prev) % cycle + prev
-                    return self.grid_history[ind][2]
-            self.grid_history.append((i, self.grid, self.load))
-            i += 1
+        return self.engine.load(self.rounds)
+
+    @property
+    def fingerprint(self) -> str:
+        # The cubes never change, so the round rocks (a bit each) pin down the state
+        return self.get_hash(np.packbits(self.rounds))
+
+    def cycle(self, n=1, rolling: bool = False) -> int:
+        # The load after n spin cycles. The platform soon settles into a loop,
+        # spotted by looking each state's fingerprint up in a dict of the ones
+        # seen so far; only the loads are kept.
+        if rolling:
+            return self.cycle_rolling(n)
+        seen = {self.fingerprint: 0}
+        loads = [self.load]
+        for i in range(1, n + 1):
+            self.rounds = self.engine.spin(self.rounds)
+            fingerprint = self.fingerprint
+            if fingerprint in seen:
+                prev = seen[fingerprint]
+                return loads[(n - prev) % (i - prev) + prev]
+            seen[fingerprint] = i
+            loads.append(self.load)
+        return loads[n]
+
+    def cycle_rolling(self, n: int) -> int:
+        # Brent's cycle finding, for boards and cycle counts too big to keep a
+        # record of: only a couple of states are ever held, at the price of
+        # going round the loop a few more times
+        if not n:
+            return self.load
+        spin = self.engine.spin
+        start = self.rounds
+        tortoise, hare, steps = start, spin(start), 1
+        power = length = 1
+        while not np.array_equal(tortoise, hare):
+            if steps == n:
+                self.rounds = hare
+                return self.load
+            if power == length:
+                tortoise, power, length = hare, power * 2, 0
+            hare, steps, length = spin(hare), steps + 1, length + 1
+        if steps == n:
+            self.rounds = hare
+            return self.load
+
+        # Now find where the loop starts by walking two states length apart
+        tortoise, hare = start, start
+        for _ in range(length):
+            hare = spin(hare)
+        loop_start = 0
+        while not np.array_equal(tortoise, hare):
+            tortoise, hare, loop_start = spin(tortoise), spin(hare), loop_start + 1
+        for _ in range((n - loop_start) % length):
+            tortoise = spin(tortoise)
+        self.rounds = tortoise
+        return self.load
 
     def get_hash(self, arr: np.array) -> str:
         arr_bytes = arr.tobytes()
@@ -37,62 +138,34 @@ class Platform:
         return hash_object.hexdigest()
 
     def tilt(self, d: MapDirection):
-        k = 1 if d == MapDirection.NORTH else 0 if d == MapDirection.WEST else \
-            3 if d == MapDirection.SOUTH else 2
-        self.grid = np.rot90(self.grid, k=k)
-        new_grid = []
-
-        for i in range(self.size):
-            row = self.grid[i, :]
-            new_row = self.process_row(row)
-            new_grid.append(new_row)
-
-        self.grid = np.rot90(np.vstack(new_grid), k=-k)
+        self.rounds = self.engine.tilt(self.rounds, d)
         return self.load
 
-    def process_row(self, row):
-        new_row = []
+    @staticmethod
+    def calculate_load(subset: np.array, height: int) -> int:
+        round_rocks = sum(subset == ROUND)
+        return sum([l for l in range(height, height - round_rocks, -1)])
 
-        ind = np.where(row == 1)[0]
-        if ind.size > 0 and ind[0] == 0:
-            new_row.append(1)
-            row = row[1:]
 
-        while row.size > 0:
-            ind = np.where(row == 1)[0]
-            subset = row[:ind[0]] if ind.size > 0 else row
-            row = row[ind[0] + 1:] if ind.size > 0 else np.array([])
-            new_subset = self.let_rocks_roll(subset)
-            new_row.extend(new_subset)
+def parse_input(data: List[str]) -> Grid:
+    return Grid.from_lines(data)
 
-            if ind.size > 0:
-                new_row.append(1)
 
-        new_subset = self.let_rocks_roll(row)
-        new_row.extend(new_subset)
+def part1(grid: Grid) -> int:
+    platform = Platform(grid)
+    platform.tilt(MapDirection.NORTH)
+    return platform.load
 
-        return np.array(new_row)
 
-    @staticmethod
-    def let_rocks_roll(subset: np.array):
-        round_rocks = np.where(subset == 0)[0].shape[0]
-        return np.concatenate((np.array([0] * round_rocks),
-                                     np.array([None] * (len(subset) - round_rocks))))
-
-    @staticmethod
-    def calculate_load(subset: np.array, height: int) -> int:
-        round_rocks = sum(subset == 0)
-        return sum([l for l in range(height, height - round_rocks, -1)])
+def part2(grid: Grid) -> int:
+    platform = Platform(grid)
+    return platform.cycle(NUM_CYCLES)
 
 
 if __name__ == '__main__':
     filename = 'input/Day14.txt'
-    data = read_file(filename)
-    arr = np.array([[1 if ele == '#' else 0 if ele == 'O' else None for ele in line] for line in data])
+    grid = parse_input(read_input(filename))
 
-    platform = Platform(arr)
-    load = platform.tilt(MapDirection.NORTH)
-    print(f"The answer to part 1 is {platform.load}.")
+    print(f"The answer to part 1 is {part1(grid)}.")
 
-    platform = Platform(arr)
-    print(f"The answer to part 2 is {platform.cycle(NUM_CYCLES)}")
+    print(f"The answer to part 2 is {part2(grid)}")
@@ -1,8 +1,22 @@
-from utils import read_file
-from typing import Dict, Tuple, List
-from queue import Queue
+from __future__ import annotations
 
-import numpy as np
+from utils import read_file, Grid, CSRGraph, lazy_import, process_pool
+from typing import TYPE_CHECKING, Callable, Tuple, List, Optional
+from collections import deque
+
+if TYPE_CHECKING:
+    from multiprocessing import shared_memory
+
+np = lazy_import('numpy')
+
+# Each tile keeps the directions beams have crossed it in as bits
+DIRECTION_BITS = {'>': 1, '<': 2, '^': 4, 'v': 8}
+
+MOVES = {'>': (0, 1), '<': (0, -1), '^': (-1, 0), 'v': (1, 0)}
+TURNS = {'/': {'>': '^', '<': 'v', '^': '>', 'v': '<'},
+         '\\': {'>': 'v', '<': '^', '^': '<', 'v': '>'}}
+# Which beams a splitter splits, and the directions the two halves go off in
+SPLITS = {'|': {'<': '^v', '>': '^v'}, '-': {'^': '<>', 'v': '<>'}}
 
 
 class State:
@@ -13,24 +27,25 @@ class State:
 
 
 class Contraption:
-    tiles = None
-    max_positions = None
-    mirrors: Dict[Tuple[int, int], str] = {}
-
-    @classmethod
-    def initialize_tiles(cls, data: List[str]):
-        cls.max_positions = (len(data) - 1, len(data[0]) - 1)
-        cls.tiles = {(i, j): {'>': False, '<': False, '^': False, 'v': False} for \
-                     j in range(len(data[0])) for i in range(len(data))}
+    # The mirrors are fixed once it's built, so any number of beams (or
+    # processes) can share one. Where the beams have been is kept per run.
+    def __init__(self, mirrors: Grid):
+        cells = mirrors.cells.view()
+        cells.flags.writeable = False
+        self.mirrors = Grid(cells)
+        self.max_positions = (mirrors.height - 1, mirrors.width - 1)
 
     @classmethod
-    def initialize_mirrors(cls, data: List[str]):
-        cls.mirrors = {(i, j): ele for i, line in enumerate(data) for \
-                       j, ele in enumerate(line)}
+    def from_lines(cls, data: List[str]) -> Contraption:
+        return cls(Grid.from_lines(data))
 
-    @classmethod
-    def update_tiles(cls, state: State):
-        cls.tiles[(state.x, state.y)][state.symbol] = True
+    def energise(self, state: State) -> int:
+        tiles = Grid(np.zeros(self.mirrors.shape, dtype=np.uint8))
+        queue = deque([Beam(state)])
+        while queue:
+            beam = queue.popleft()
+            queue.extend(Beam(new_state) for new_state in beam.travel(self, tiles))
+        return np.count_nonzero(tiles.cells)
 
 
 class Beam:
@@ -41,28 +56,29 @@ class Beam:
     def pos(self):
         return self.state.x, self.state.y
 
-    def travel(self):
+    def travel(self, contraption: Contraption, tiles: Grid):
         while True:
             # Check if we're off the grid
             if self.state.x < 0 or self.state.y < 0 or \
-                    self.state.x > Contraption.max_positions[0] or \
-                    self.state.y > Contraption.max_positions[1]:
+                    self.state.x > contraption.max_positions[0] or \
+                    self.state.y > contraption.max_positions[1]:
                 return []
 
             # Check if a beam with this state has been here before
-            if Contraption.tiles[(self.state.x, self.state.y)][self.state.symbol]:
+            if tiles.get(self.pos) & DIRECTION_BITS[self.state.symbol]:
                 return []
 
             # Update the grid to say we've visited this state
-            Contraption.update_tiles(self.state)
+            tiles[self.pos] |= DIRECTION_BITS[self.state.symbol]
 
             # Check if we've hit a splitter
-            if Contraption.mirrors[self.pos] == '|' and self.state.symbol in ["<", ">"] or \
-                    Contraption.mirrors[self.pos] == '-' and self.state.symbol in ["^", "v"]:
-                return self.split(Contraption.mirrors[self.pos])
+            mirror = contraption.mirrors.char(self.pos)
+            if mirror == '|' and self.state.symbol in ["<", ">"] or \
+                    mirror == '-' and self.state.symbol in ["^", "v"]:
+                return self.split(mirror)
 
             # Otherwise update this beam and keep going
-            self.state = self.get_new_position(Contraption.mirrors[self.pos])
+            self.state = self.get_new_position(mirror)
 
     def split(self, symbol: str) -> List[State]:
         if symbol == '|':
@@ -116,38 +132,224 @@ class Beam:
                 return State('>', (self.state.x, self.state.y + 1))
 
 
-def process_state(state: State) -> int:
-    Contraption.initialize_tiles(data)
-    Contraption.initialize_mirrors(data)
-
-    queue = Queue()
-    queue.put(Beam(state))
-
-    while not queue.empty():
-        beam = queue.get()
-        new_states = beam.travel()
-        for state in new_states:
-            queue.put(Beam(state))
-
-    energized_array = np.array([[sum(Contraption.tiles.get((i, j), {}).values()) \
-                                 for j in range(Contraption.max_positions[1] + 1)] \
-                                for i in range(Contraption.max_positions[0] + 1)], dtype=bool)
-    return energized_array.sum().sum()
+def process_state(data: List[str], state: State) -> int:
+    return Contraption.from_lines(data).energise(state)
+
+
+class BeamGraph:
+    # The contraption compiled once. Away from the splitters a beam's path is
+    # fixed, and two paths never run into each other (every step can be
+    # undone), so it's traced once from each side of each splitter. That
+    # leaves a graph whose nodes are the splitters: each has the cells its two
+    # beams light up and an edge to every splitter they run into. The graph
+    # is condensed into its strongly connected components, and each component
+    # gets the bitset of every cell lit from it, built up from the ones after
+    # it. Energising from any start is then one traced path and a union.
+    def __init__(self, data: List[str]):
+        self.data = data
+        self.height, self.width = len(data), len(data[0])
+        splitters = [(i, j) for i, row in enumerate(data) for j, tile in enumerate(row) if tile in SPLITS]
+        self.nodes = {pos: node for node, pos in enumerate(splitters)}
+
+        lit, edges = [], []
+        for node, (i, j) in enumerate(splitters):
+            cells = [i * self.width + j]
+            for d in next(iter(SPLITS[data[i][j]].values())):
+                path, target = self.trace((i + MOVES[d][0], j + MOVES[d][1]), d)
+                cells.extend(path)
+                if target is not None:
+                    edges.append((node, target, 1))
+            lit.append(self.to_bits(cells))
+
+        graph = CSRGraph.from_edges(len(splitters), edges)
+        self.components = graph.components()
+        num_components = max(self.components, default=-1) + 1
+        members = [[] for _ in range(num_components)]
+        for node, component in enumerate(self.components):
+            members[component].append(node)
+        # Successors always come first in component order
+        self.reach = [0] * num_components
+        for component, nodes in enumerate(members):
+            bits = 0
+            for node in nodes:
+                bits |= lit[node]
+                for target, _ in graph.neighbors(node):
+                    if self.components[target] != component:
+                        bits |= self.reach[self.components[target]]
+            self.reach[component] = bits
+
+    def trace(self, pos: Tuple[int, int], d: str) -> Tuple[List[int], Optional[int]]:
+        # The cells a beam crosses until it leaves, goes round a loop of
+        # mirrors, or is split (and by which splitter)
+        (i, j), cells, seen = pos, [], set()
+        while 0 <= i < self.height and 0 <= j < self.width and (i, j, d) not in seen:
+            seen.add((i, j, d))
+            cells.append(i * self.width + j)
+            tile = self.data[i][j]
+            if tile in SPLITS and d in SPLITS[tile]:
+                return cells, self.nodes[(i, j)]
+            if tile in TURNS:
+                d = TURNS[tile][d]
+            i, j = i + MOVES[d][0], j + MOVES[d][1]
+        return cells, None
+
+    def to_bits(self, cells: List[int]) -> int:
+        bits = bytearray((self.height * self.width + 7) // 8)
+        for cell in cells:
+            bits[cell >> 3] |= 1 << (cell & 7)
+        return int.from_bytes(bits, 'little')
+
+    def energised(self, state: State) -> int:
+        cells, target = self.trace((state.x, state.y), state.symbol)
+        bits = self.to_bits(cells)
+        if target is not None:
+            bits |= self.reach[self.components[target]]
+        return bits.bit_count()
+
+
+class BeamFrontier:
+    # Every beam moved at once: boolean arrays, one per direction, of the
+    # cells beams have just come into heading that way, for a batch of
+    # starts side by side. A step sends each one through the lookup masks
+    # for its tile, moves it on a cell and drops whatever has been seen
+    # before. When nothing is left the visited arrays have stopped changing.
+    DIRECTIONS = list(DIRECTION_BITS)
+
+    def __init__(self, mirrors: Grid):
+        self.shape = mirrors.shape
+        # sends[a][b] marks the tiles that turn a beam heading a into one
+        # heading b (None where there are none)
+        self.sends = [[None] * 4 for _ in range(4)]
+        for code in np.unique(mirrors.cells).tolist():
+            mask = mirrors.cells == code
+            for a, d in enumerate(self.DIRECTIONS):
+                for out in self.outgoing(chr(code), d):
+                    b = self.DIRECTIONS.index(out)
+                    self.sends[a][b] = mask if self.sends[a][b] is None else self.sends[a][b] | mask
+
+    @staticmethod
+    def outgoing(tile: str, d: str) -> str:
+        if tile in SPLITS and d in SPLITS[tile]:
+            return SPLITS[tile][d]
+        return TURNS[tile][d] if tile in TURNS else d
+
+    def step(self, frontier: np.ndarray) -> np.ndarray:
+        turned = np.zeros_like(frontier)
+        for a in range(4):
+            if not frontier[a].any():
+                continue
+            for b in range(4):
+                if self.sends[a][b] is not None:
+                    turned[b] |= frontier[a] & self.sends[a][b]
+        moved = np.zeros_like(frontier)
+        moved[0, :, :, 1:] = turned[0, :, :, :-1]
+        moved[1, :, :, :-1] = turned[1, :, :, 1:]
+        moved[2, :, :-1] = turned[2, :, 1:]
+        moved[3, :, 1:] = turned[3, :, :-1]
+        return moved
+
+    def energised(self, states: List[State], batch: int = 64) -> np.ndarray:
+        counts = []
+        for start in range(0, len(states), batch):
+            chunk = states[start:start + batch]
+            frontier = np.zeros((4, len(chunk), *self.shape), dtype=bool)
+            for row, state in enumerate(chunk):
+                frontier[self.DIRECTIONS.index(state.symbol), row, state.x, state.y] = True
+            visited = frontier.copy()
+            # Starts drop out of the batch as their beams die out
+            rows = np.arange(len(chunk))
+            done = np.zeros(len(chunk), dtype=int)
+            while len(rows):
+                frontier = self.step(frontier)
+                frontier &= ~visited
+                visited |= frontier
+                alive = frontier.any(axis=(0, 2, 3))
+                if not alive.all():
+                    done[rows[~alive]] = np.count_nonzero(visited[:, ~alive].any(axis=0), axis=(1, 2))
+                    rows, frontier, visited = rows[alive], frontier[:, alive], visited[:, alive]
+            counts.append(done)
+        return np.concatenate(counts) if counts else np.zeros(0, dtype=int)
+
+
+def get_starting_states(data: List[str]) -> List[State]:
+    max_x, max_y = len(data) - 1, len(data[0]) - 1
+    return [State('v', (0, j)) for j in range(max_y + 1)] + \
+        [State('^', (max_x, j)) for j in range(max_y + 1)] + \
+        [State('>', (i, 0)) for i in range(max_x + 1)] + \
+        [State('<', (i, max_y)) for i in range(max_x + 1)]
+
+
+def parse_input(data: List[str]) -> List[str]:
+    return data
+
+
+def build_engine(mirrors: Grid, engine: str = 'graph') -> Callable[[List[State]], List[int]]:
+    # How many tiles each start lights up: looked up on the compiled graph,
+    # simulated on whole arrays, or followed a beam at a time
+    if engine == 'beams':
+        contraption = Contraption(mirrors)
+        return lambda states: [contraption.energise(state) for state in states]
+    if engine == 'frontier':
+        frontier = BeamFrontier(mirrors)
+        return lambda states: frontier.energised(states).tolist()
+    graph = BeamGraph([row.tobytes().decode() for row in mirrors.cells])
+    return lambda states: [graph.energised(state) for state in states]
+
+
+# What each pool worker builds once from the shared mirrors
+worker_memory: Optional[shared_memory.SharedMemory] = None
+worker_engine: Optional[Callable[[List[State]], List[int]]] = None
+
+
+def attach_mirrors(name: str, shape: Tuple[int, int], engine: str):
+    from multiprocessing import shared_memory
+    global worker_memory, worker_engine
+    worker_memory = shared_memory.SharedMemory(name=name)
+    worker_engine = build_engine(Grid(np.ndarray(shape, dtype=np.uint8, buffer=worker_memory.buf)), engine)
+
+
+def energise_chunk(starts: List[Tuple[str, int, int]]) -> List[int]:
+    return worker_engine([State(symbol, (x, y)) for symbol, x, y in starts])
+
+
+def sweep(data: List[str], states: List[State], engine: str, workers: int, chunksize: int = None) -> List[int]:
+    # The starts are independent, so they're spread over a process pool.
+    # The mirrors go into shared memory once and every worker builds its
+    # engine over them rather than being sent a copy with each chunk.
+    from multiprocessing import shared_memory
+    mirrors = Grid.from_lines(data)
+    memory = shared_memory.SharedMemory(create=True, size=mirrors.cells.nbytes)
+    try:
+        np.ndarray(mirrors.shape, dtype=np.uint8, buffer=memory.buf)[:] = mirrors.cells
+        starts = [(state.symbol, state.x, state.y) for state in states]
+        chunksize = chunksize or max(1, -(-len(starts) // (4 * workers)))
+        chunks = [starts[start:start + chunksize] for start in range(0, len(starts), chunksize)]
+        with process_pool(workers, attach_mirrors, (memory.name, mirrors.shape, engine)) as executor:
+            return [count for counts in executor.map(energise_chunk, chunks) for count in counts]
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def energise(data: List[str], states: List[State], engine: str = 'graph', workers: int = None) -> List[int]:
+    if workers:
+        return sweep(data, states, engine, workers)
+    return build_engine(Grid.from_lines(data), engine)(states)
+
+
+def part1(data: List[str], engine: str = 'graph') -> int:
+    return energise(data, [State('>', (0, 0))], engine)[0]
+
+
+def part2(data: List[str], engine: str = 'graph', workers: int = None) -> int:
+    # Now we're going to start from each edge point
+    return max(energise(data, get_starting_states(data), engine, workers))
 
 
 if __name__ == "__main__":
     filename = 'input/Day16.txt'
-    data = read_file(filename)
+    data = parse_input(read_file(filename))
 
-    print(f"The answer to part 1 is {process_state(State('>', (0, 0)))}.")
+    print(f"The answer to part 1 is {part1(data)}.")
 
-    # Now we're going to start from each edge point
-    starting_states = [State('v', (0, j)) for j in range(Contraption.max_positions[1] + 1)] + \
-        [State('^', (Contraption.max_positions[0], j)) for j in range(Contraption.max_positions[1] + 1)] + \
-        [State('>', (i, 0)) for i in range(Contraption.max_positions[0] + 1)] + \
-        [State('<', (i, Contraption.max_positions[1])) for i in range(Contraption.max_positions[0] + 1)]
-
-    energy_levels = []
-    for state in starting_states:
-        energy_levels.append(process_state(state))
-    print(f"The answer to part 2 is {max(energy_levels)}.")
+    print(f"The answer to part 2 is {part2(data)}.")
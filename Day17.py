@@ -1,112 +1,214 @@
 from __future__ import annotations
 
-from utils import read_file, Part
-from typing import Tuple
+from utils import read_input, char_grid, dijkstra, Grid, Part, lazy_import
 import heapq
+from typing import Callable, List, Optional, Tuple
 
-import numpy as np
+np = lazy_import('numpy')
 
 
-LARGE = 1_000_000
+# The shortest and longest runs a crucible can make before turning
+RULES = {Part.PT1: (1, 3), Part.PT2: (4, 10)}
 
-
-deltas = {0: (0, 1), 1: (1, 0), 2: (0, -1), 3: (-1, 0)}
-
-
-class State:
-    def __init__(self, pos: Tuple[int, int], direction: int, steps: int):
-        self.pos = pos
-        self.direction = direction
-        self.steps = steps
-
-    def __str__(self):
-        return f"State({self.pos}, {self.direction}, {self.steps})"
-
-    def __lt__(self, other: State):
-        return self.steps < other.steps
-
-    def __eq__(self, other: State):
-        return self.pos is other.pos and \
-               self.direction == other.direction and \
-               self.steps == other.steps
+# Which way the last run went
+ACROSS, DOWN = 0, 1
 
 
 class Graph:
-    def __init__(self, costs: np.array, part: Part):
-        self.part = part
-        self.maxx, self.maxy = costs.shape
+    # The crucible turns at the end of every run, so a search state is just
+    # the cell a run ended on and which way it went, packed into one int as
+    # cell * 2 + axis. From there it sets off the other way for anywhere from
+    # min_run to max_run blocks. Prefix sums along the rows and columns price
+    # any such jump in O(1), so one graph answers any number of queries with
+    # different rules, sources and targets.
+    def __init__(self, costs: Grid):
         self.edge_costs = costs
-        self.total_costs = {}
+        self.maxx, self.maxy = costs.shape
+        cells = costs.cells.astype(np.int64)
+        # row_sums[r][c] is the cost of row r up to (not including) column c,
+        # and col_sums[c][r] the same down column c
+        self.row_sums = np.pad(cells.cumsum(axis=1), ((0, 0), (1, 0))).tolist()
+        self.col_sums = np.pad(cells.cumsum(axis=0), ((1, 0), (0, 0))).T.tolist()
+        self.largest = int(cells.max(initial=0))
+        # The unconstrained cost to each target asked about so far
+        self.reverse_costs = {}
+        self.expanded = 0
+
+    def get_jumps(self, min_run: int, max_run: int) -> Callable[[int], List[Tuple[int, int]]]:
+        runs = range(min_run, max_run + 1)
+        maxx, maxy = self.maxx, self.maxy
+
+        def jumps(state: int) -> List[Tuple[int, int]]:
+            cell, axis = state >> 1, state & 1
+            row, col = divmod(cell, maxy)
+            neighbors = []
+            if axis == DOWN:
+                sums = self.row_sums[row]
+                for run in runs:
+                    if col + run < maxy:
+                        neighbors.append((((cell + run) << 1) | ACROSS, sums[col + run + 1] - sums[col + 1]))
+                    if col - run >= 0:
+                        neighbors.append((((cell - run) << 1) | ACROSS, sums[col] - sums[col - run]))
+            else:
+                sums = self.col_sums[col]
+                for run in runs:
+                    if row + run < maxx:
+                        neighbors.append((((cell + run * maxy) << 1) | DOWN, sums[row + run + 1] - sums[row + 1]))
+                    if row - run >= 0:
+                        neighbors.append((((cell - run * maxy) << 1) | DOWN, sums[row] - sums[row - run]))
+            return neighbors
+        return jumps
+
+    def get_reverse_jumps(self, min_run: int, max_run: int) -> Callable[[int], List[Tuple[int, int]]]:
+        # The states a jump could have come from to end in this one, and what
+        # that jump cost (every block after where it started, up to here)
+        runs = range(min_run, max_run + 1)
+        maxx, maxy = self.maxx, self.maxy
+
+        def reverse_jumps(state: int) -> List[Tuple[int, int]]:
+            cell, axis = state >> 1, state & 1
+            row, col = divmod(cell, maxy)
+            neighbors = []
+            if axis == ACROSS:
+                sums = self.row_sums[row]
+                for run in runs:
+                    if col - run >= 0:
+                        neighbors.append((((cell - run) << 1) | DOWN, sums[col + 1] - sums[col - run + 1]))
+                    if col + run < maxy:
+                        neighbors.append((((cell + run) << 1) | DOWN, sums[col + run] - sums[col]))
+            else:
+                sums = self.col_sums[col]
+                for run in runs:
+                    if row - run >= 0:
+                        neighbors.append((((cell - run * maxy) << 1) | ACROSS, sums[row + 1] - sums[row - run + 1]))
+                    if row + run < maxx:
+                        neighbors.append((((cell + run * maxy) << 1) | ACROSS, sums[row + run] - sums[row]))
+            return neighbors
+        return reverse_jumps
+
+    def get_heuristic(self, target: Tuple[int, int], heuristic: Optional[str]) -> List[int]:
+        # A lower bound on the heat still to lose from each cell. 'manhattan'
+        # counts a block per step; 'reverse' is the cheapest way to the
+        # target with no limits on the runs at all, found once per target by
+        # relaxing the whole grid against its neighbours until nothing
+        # changes. Either way a jump can't lower the estimate by more than it
+        # costs, so A* on it finds the cheapest path.
+        if heuristic is None:
+            return [0] * (self.maxx * self.maxy)
+        if heuristic == 'manhattan':
+            rows, cols = np.divmod(np.arange(self.maxx * self.maxy), self.maxy)
+            return (np.abs(target[0] - rows) + np.abs(target[1] - cols)).tolist()
+        if heuristic != 'reverse':
+            raise ValueError(f'unknown heuristic {heuristic!r}')
+        if target not in self.reverse_costs:
+            cells = self.edge_costs.cells.astype(np.int64)
+            remaining = np.full(cells.shape, np.iinfo(np.int64).max // 2, dtype=np.int64)
+            remaining[target] = 0
+            while True:
+                # Going from a cell to its neighbour costs the neighbour
+                through = remaining + cells
+                relaxed = remaining.copy()
+                np.minimum(relaxed[1:], through[:-1], out=relaxed[1:])
+                np.minimum(relaxed[:-1], through[1:], out=relaxed[:-1])
+                np.minimum(relaxed[:, 1:], through[:, :-1], out=relaxed[:, 1:])
+                np.minimum(relaxed[:, :-1], through[:, 1:], out=relaxed[:, :-1])
+                if np.array_equal(relaxed, remaining):
+                    break
+                remaining = relaxed
+            self.reverse_costs[target] = remaining.ravel().tolist()
+        return self.reverse_costs[target]
+
+    def find_shortest_path(self, min_run: int, max_run: int, source: Tuple[int, int] = (0, 0),
+                           target: Tuple[int, int] = None, buckets: bool = False,
+                           heuristic: Optional[str] = 'reverse', bidirectional: bool = False) -> Optional[int]:
+        # The least heat lost getting from source to target (the bottom right
+        # by default) with runs of min_run to max_run blocks, or None if it
+        # can't be done. The crucible can set off either way from the source.
+        # How many states the search expanded is left in self.expanded.
+        if not 1 <= min_run <= max_run:
+            raise ValueError(f'runs must satisfy 1 <= min_run <= max_run, not {min_run} and {max_run}')
+        target = target or (self.maxx - 1, self.maxy - 1)
+        for pos in [source, target]:
+            if not self.edge_costs.in_bounds(pos):
+                raise ValueError(f'{pos} is off the grid')
+        self.expanded = 0
+        source_cell, target_cell = source[0] * self.maxy + source[1], target[0] * self.maxy + target[1]
+        if source_cell == target_cell:
+            return 0
+
+        sources = [(source_cell << 1) | ACROSS, (source_cell << 1) | DOWN]
+        jumps = self.get_jumps(min_run, max_run)
+        if bidirectional:
+            targets = [(target_cell << 1) | ACROSS, (target_cell << 1) | DOWN]
+            return self.search_both_ways(sources, targets, jumps, self.get_reverse_jumps(min_run, max_run))
+        remaining = self.get_heuristic(target, heuristic)
+        # A jump raises the priority by its cost plus at most what the jump
+        # back would cost
+        span = 2 * self.largest * max_run + 1 if buckets else None
+        return dijkstra(sources, self.count_expanded(jumps), lambda state: state >> 1 == target_cell,
+                        lambda state: remaining[state >> 1], span)
+
+    def count_expanded(self, jumps: Callable[[int], List[Tuple[int, int]]]) -> Callable[[int], List[Tuple[int, int]]]:
+        # The same jumps, counting each state they're asked about (every state
+        # the search expands, bar the target) in self.expanded
+        def counted(state: int) -> List[Tuple[int, int]]:
+            self.expanded += 1
+            return jumps(state)
+        return counted
+
+    def search_both_ways(self, sources: List[int], targets: List[int],
+                         jumps: Callable[[int], List[Tuple[int, int]]],
+                         reverse_jumps: Callable[[int], List[Tuple[int, int]]]) -> Optional[int]:
+        # Dijkstra from the source and (over the jumps backwards) from the
+        # target at once, always growing the side whose frontier is nearer.
+        # Every time an edge reaches a state the other side has a cost for,
+        # that's a whole path. Once the two frontiers together cost at least
+        # the best path seen, nothing cheaper can turn up.
+        unseen = np.iinfo(np.int64).max
+        sides = []
+        for starts, edges in [(sources, jumps), (targets, reverse_jumps)]:
+            best = np.full(2 * self.maxx * self.maxy, unseen, dtype=np.int64)
+            best[starts] = 0
+            sides.append((best, [(0, start) for start in starts], edges))
+        shortest = None
+        while sides[0][1] and sides[1][1]:
+            if shortest is not None and sides[0][1][0][0] + sides[1][1][0][0] >= shortest:
+                break
+            side = 0 if sides[0][1][0][0] <= sides[1][1][0][0] else 1
+            best, queue, edges = sides[side]
+            other = sides[1 - side][0]
+            cost, state = heapq.heappop(queue)
+            if cost > best[state]:
+                continue
+            self.expanded += 1
+            for neighbor, edge_cost in edges(state):
+                new_cost = cost + edge_cost
+                if new_cost < best[neighbor]:
+                    best[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+                if other[neighbor] < unseen:
+                    total = new_cost + int(other[neighbor])
+                    shortest = total if shortest is None else min(shortest, total)
+        return shortest
 
-    def find_shortest_path(self):
-        state1, state2 = State((0, 0), 0, 0), State((0, 0), 1, 0)
-        self.total_costs[str(state1)] = 0
-        self.total_costs[str(state2)] = 0
 
-        queue = [(0, state1), (0, state2)]
-        while queue:
-            cost, state = heapq.heappop(queue)
+def parse_input(data: List[str]) -> Graph:
+    # Both parts (and any other queries) share the one graph
+    return Graph(Grid(char_grid(data) - ord('0')))
 
-            if state.pos == (self.maxx - 1, self.maxy - 1):
-                return self.total_costs[str(state)]
 
-            if cost > self.total_costs[str(state)]:
-                continue
-            neighbors = self.get_neighbors(state, self.part)
+def part1(graph: Graph) -> int:
+    return graph.find_shortest_path(*RULES[Part.PT1])
 
-            for neighbor in neighbors:
-                new_cost = cost + self.edge_costs[neighbor.pos]
-                if new_cost < self.total_costs.get(str(neighbor), LARGE):
-                    self.total_costs[str(neighbor)] = new_cost
-                    heapq.heappush(queue, (new_cost, neighbor))
 
-    def get_neighbors(self, state: State, part: Part):
-        neighbors = []
-        if part == part.PT1:
-            # we can always turn
-            for delta_direction in [1, -1]:
-                new_dir = (state.direction + delta_direction) % 4
-                new_pos = self.get_new_position(state.pos, new_dir)
-                neighbors.append(State(new_pos, new_dir, 1))
-            # if we've taken fewer than three steps we can also continue straight
-            if state.steps < 3:
-                new_pos = self.get_new_position(state.pos, state.direction)
-                neighbors.append(State(new_pos, state.direction, state.steps + 1))
-
-        else:
-            # if we have taken fewer than ten steps we can continue on
-            if state.steps < 10:
-                new_pos = self.get_new_position(state.pos, state.direction)
-                # if the neighbor is the end state and we haven't taken at least 4 steps we
-                # can't visit it
-                if not (new_pos == (self.maxx-1, self.maxy-1) and state.steps < 4):
-                    neighbors.append(State(new_pos, state.direction, state.steps + 1))
-
-            if state.steps > 3:
-                # if we have taken four steps in same direction we can turn
-                for delta_direction in [1, -1]:
-                    new_dir = (state.direction + delta_direction) % 4
-                    new_pos = self.get_new_position(state.pos, new_dir)
-                    neighbors.append(State(new_pos, new_dir, 1))
-
-        # only return neighbors that are not off the grid
-        return [n for n in neighbors if 0 <= n.pos[0] < self.maxx and 0 <= n.pos[1] < self.maxy]
-
-    @staticmethod
-    def get_new_position(pos: Tuple[int, int], direction: int) -> Tuple[int, int]:
-        return pos[0] + deltas[direction][0], pos[1] + deltas[direction][1]
+def part2(graph: Graph) -> int:
+    return graph.find_shortest_path(*RULES[Part.PT2])
 
 
 if __name__ == "__main__":
     filename = 'input/Day17.txt'
-    data = read_file(filename)
-
-    graph = Graph(np.array([[int(ele) for ele in line] for line in data]), Part.PT1)
-    costs = [graph.find_shortest_path()]
-
-    print(f"The answer to part 1 is {min(costs)}")
+    graph = parse_input(read_input(filename))
 
-    graph = Graph(np.array([[int(ele) for ele in line] for line in data]), Part.PT2)
-    costs = [graph.find_shortest_path()]
+    print(f"The answer to part 1 is {part1(graph)}")
 
-    print(f"The answer to part 2 is {min(costs)}")
+    print(f"The answer to part 2 is {part2(graph)}")
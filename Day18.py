@@ -1,8 +1,9 @@
-from utils import read_file
+from utils import read_file, Grid, lazy_import
 from typing import List, Tuple
 from collections import deque
-import numpy as np
-from shapely.geometry import Polygon, Point
+
+np = lazy_import('numpy')
+geometry = lazy_import('shapely.geometry')
 
 
 SIZE = 1000
@@ -22,7 +23,7 @@ class Instruction:
 class Trench:
     def __init__(self, data: List[str]):
         self.instructions = [Instruction(line) for line in data]
-        self.grid = np.zeros((SIZE, SIZE), dtype=bool)
+        self.grid = Grid(np.zeros((SIZE, SIZE), dtype=np.uint8))
         self.pos = INITIAL
 
     def dig_trench(self):
@@ -58,7 +59,7 @@ class Trench:
 
     @property
     def dimensions(self) -> Tuple[Tuple[int, int], int, int]:
-        nonzero_indices = np.nonzero(self.grid)
+        nonzero_indices = np.nonzero(self.grid.cells)
         corner = np.min(nonzero_indices[0]), np.min(nonzero_indices[1])
         num_rows = np.max(nonzero_indices[0]) - corner[0] + 1
         num_cols = np.max(nonzero_indices[1]) - corner[1] + 1
@@ -67,9 +68,9 @@ class Trench:
 
     def reset_grid(self):
         total_area = self.grid[self.corner[0]: self.corner[0] + self.num_rows,
-                            self.corner[1]: self.corner[1] + self.num_cols]
+                               self.corner[1]: self.corner[1] + self.num_cols]
         # reset our grid so it's centered on 0, 0
-        self.grid = total_area.copy()
+        self.grid = Grid(total_area.copy())
 
     def fill(self, i, j):
         stack = deque([(i, j)])
@@ -79,14 +80,7 @@ class Trench:
             self.grid[current_i, current_j] = True
 
             # Check and add neighbors to the stack if not filled
-            if current_j + 1 < self.grid.shape[1] and not self.grid[current_i, current_j + 1]:
-                stack.append((current_i, current_j + 1))
-            if current_j - 1 >= 0 and not self.grid[current_i, current_j - 1]:
-                stack.append((current_i, current_j - 1))
-            if current_i + 1 < self.grid.shape[0] and not self.grid[current_i + 1, current_j]:
-                stack.append((current_i + 1, current_j))
-            if current_i - 1 >= 0 and not self.grid[current_i - 1, current_j]:
-                stack.append((current_i - 1, current_j))
+            stack.extend(n for n in self.grid.neighbors((current_i, current_j)) if not self.grid[n])
 
 
 class Instruction2:
@@ -109,7 +103,7 @@ class Trench2:
 
     @property
     def polygon(self):
-        return Polygon(self.vertices)
+        return geometry.Polygon(self.vertices)
 
     def dig_trench(self):
         for instr in self.instructions:
@@ -127,16 +121,28 @@ class Trench2:
             self.vertices.append(self.pos)
 
 
-if __name__ == "__main__":
-    filename = 'input/Day18.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[str]:
+    return data
 
+
+def part1(data: List[str]) -> int:
     trench = Trench(data)
     trench.dig_trench()
     trench.reset_grid()
     trench.fill(1, np.nonzero(trench.grid[0, :])[0][0] + 1)
-    print(f"The answer to Part 1 is {trench.grid.sum().sum()}")
+    return np.count_nonzero(trench.grid.cells)
+
 
+def part2(data: List[str]) -> int:
     trench2 = Trench2(data)
     trench2.dig_trench()
-    print(f"The answer to Part 2 is {trench2.area}")
+    return trench2.area
+
+
+if __name__ == "__main__":
+    filename = 'input/Day18.txt'
+    data = parse_input(read_file(filename))
+
+    print(f"The answer to Part 1 is {part1(data)}")
+
+    print(f"The answer to Part 2 is {part2(data)}")
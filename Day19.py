@@ -165,10 +165,7 @@ class Graph:
            rejected + left_rejected + right_rejected
 
 
-if __name__ == "__main__":
-    filename = 'input/Day19.txt'
-    data = read_file(filename)
-
+def parse_input(data: List[str]) -> Tuple[Dict[str, str], List[Dict[str, int]]]:
     workflows = {}
     for i in range(len(data)):
         if not data[i]:
@@ -176,15 +173,32 @@ if __name__ == "__main__":
         pts = data[i].split('{')
         workflows[pts[0]] = pts[1].replace('}', '')
 
-    # Part 1
     initial_states = [json.loads(data[j].replace('=', '":').replace('{', '{"').replace(',', ',"'))
-              for j in range(i + 1, len(data))]
+                      for j in range(i + 1, len(data))]
+    return workflows, initial_states
+
+
+def part1(parsed: Tuple[Dict[str, str], List[Dict[str, int]]]) -> int:
+    workflows, initial_states = parsed
     graph = Graph(workflows, Part.PT1)
     accepted = [state for state in initial_states if graph.traverse(graph.rule_one, state) == 'A']
-    print(f"The answer to Part 1 is {sum([sum(state.values()) for state in accepted])}")
+    return sum([sum(state.values()) for state in accepted])
 
-    # Part 2
+
+def part2(parsed: Tuple[Dict[str, str], List[Dict[str, int]]]) -> int:
+    workflows, _ = parsed
     initial_range = StateRange(range(1, 4001), range(1, 4001), range(1, 4001), range(1, 4001))
     graph = Graph(workflows, Part.PT2)
     accepted, rejected = graph.traverse2(graph.rule_one, initial_range, [], [])
-    print(f"The answer to Part 2 is {sum([a.combinations for a in accepted])}")
+    return sum([a.combinations for a in accepted])
+
+
+if __name__ == "__main__":
+    filename = 'input/Day19.txt'
+    parsed = parse_input(read_file(filename))
+
+    # Part 1
+    print(f"The answer to Part 1 is {part1(parsed)}")
+
+    # Part 2
+    print(f"The answer to Part 2 is {part2(parsed)}")
@@ -1,8 +1,10 @@
-from utils import read_file
-from typing import List, Dict
-import numpy as np
+from utils import read_file, sum_by_line, lazy_import
+from typing import Iterable, List, Dict
+
+np = lazy_import('numpy')
 
 COLORS = ['blue', 'red', 'green']
+BAG = {'red': 12, 'green': 13, 'blue': 14}
 
 
 class Game:
@@ -42,16 +44,26 @@ class EntireGame:
         return sum([game.power for game in self.games])
 
 
-if __name__ == '__main__':
-    filename = 'input/Day2.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[Game]:
+    return [Game(line) for line in data]
+
+
+def part1(games: List[Game]) -> int:
+    return sum(EntireGame(games, BAG).possible_games)
 
-    bag = {'red': 12, 'green': 13, 'blue': 14}
-    entire_game = EntireGame([Game(line) for line in data], bag)
 
-    print(f"The answer to part 1 is {sum(entire_game.possible_games)}")
+def part2(games: List[Game]) -> int:
+    return EntireGame(games, BAG).total_power
 
-    print(f"The answer to part 2 is {entire_game.total_power}")
 
+def stream(lines: Iterable[str]) -> List[int]:
+    return sum_by_line(lines, parse_input, [part1, part2])
+
+
+if __name__ == '__main__':
+    filename = 'input/Day2.txt'
+    games = parse_input(read_file(filename))
 
+    print(f"The answer to part 1 is {part1(games)}")
 
+    print(f"The answer to part 2 is {part2(games)}")
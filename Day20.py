@@ -3,10 +3,11 @@ from __future__ import annotations
 from abc import abstractmethod
 from enum import Enum, auto
 from typing import Dict, List
-import numpy as np
 from queue import Queue
 
-from utils import read_file, Part
+from utils import read_file, Part, lazy_import
+
+np = lazy_import('numpy')
 
 BROADCASTER = 'broadcaster'
 BUTTON = 'button'
@@ -132,16 +133,18 @@ class ModuleManager:
             self.modules[dest].process_pulse(pulse, source)
 
 
-if __name__ == "__main__":
-    filename = 'input/Day20.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[str]:
+    return data
 
+
+def part1(data: List[str]) -> int:
     manager = ModuleManager(data, Part.PT1)
     for i in range(NUM_CYCLES):
         manager.push_button()
+    return np.prod(np.array(list(manager.pulses.values())))
 
-    print(f"The answer to Part 1 is {np.prod(np.array(list(manager.pulses.values())))}")
 
+def part2(data: List[str]) -> int:
     # For Part 2 we have an LCM number.  We know there is one conjunction module which
     # inputs to rx, and that has four conjunction modules as inputs.
     # So each of those needs to remember high for all its inputs in order to deliver a
@@ -160,5 +163,13 @@ if __name__ == "__main__":
             num += 1
             manager.push_button()
         lcm *= num
+    return lcm
+
+
+if __name__ == "__main__":
+    filename = 'input/Day20.txt'
+    data = parse_input(read_file(filename))
+
+    print(f"The answer to Part 1 is {part1(data)}")
 
-    print(f"The answer to Part 2 is {lcm}")
+    print(f"The answer to Part 2 is {part2(data)}")
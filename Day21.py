@@ -3,30 +3,28 @@ from __future__ import annotations
 from collections import deque
 from typing import List, Tuple
 
-import numpy as np
+from utils import read_input, char_grid, Grid, lazy_import
 
-from utils import read_file
+np = lazy_import('numpy')
 
 
 class Garden:
     def __init__(self, data: List[str]):
-        self.grid = np.array([[1 if ele == '#' else 0 if ele == '.' else 2 \
-                               for ele in line] for line in data], dtype=int)
-        self.max_x = self.grid.shape[0] - 1
-        self.max_y = self.grid.shape[1] - 1
-        self.start = np.where(self.grid == 2)[0][0], np.where(self.grid == 2)[1][0]
-        self.grid = self.grid.astype(bool)
-        self.grid[self.start] = False
+        grid = char_grid(data)
+        self.max_x = grid.shape[0] - 1
+        self.max_y = grid.shape[1] - 1
+        self.start = np.where(grid == ord('S'))[0][0], np.where(grid == ord('S'))[1][0]
+        self.grid = Grid(grid == ord('#'))
         self.graph = self.build_graph()
 
     def build_graph(self):
+        # Look up the neighbors of every garden plot in one go
+        plots = np.argwhere(self.grid.cells == 0)
+        neighbors, on_grid = self.grid.neighbors_of(plots)
+        open_plots = on_grid & (self.grid[neighbors[..., 0], neighbors[..., 1]] == 0)
         graph = {}
-        for i in range(self.max_x + 1):
-            for j in range(self.max_y + 1):
-                if self.grid[i, j]:
-                    continue
-                neighbors = self.get_neighbors((i, j))
-                graph[(i, j)] = set(neighbors)
+        for plot, plot_neighbors, plot_open in zip(plots.tolist(), neighbors.tolist(), open_plots.tolist()):
+            graph[tuple(plot)] = {tuple(n) for n, is_open in zip(plot_neighbors, plot_open) if is_open}
         return graph
 
     def bfs(self, start, distance):
@@ -47,30 +45,19 @@ class Garden:
         return len(result)
 
     def get_neighbors(self, pos: Tuple[int, int]):
-        new_pos = []
-        if pos[0] > 0 and not self.grid[(pos[0]-1, pos[1])]:
-            new_pos.append((pos[0]-1, pos[1]))
-        if pos[0] < self.max_x and not self.grid[(pos[0]+1, pos[1])]:
-            new_pos.append((pos[0]+1, pos[1]))
-        if pos[1] > 0 and not self.grid[(pos[0], pos[1]-1)]:
-            new_pos.append((pos[0], pos[1]-1))
-        if pos[1] < self.max_y and not self.grid[(pos[0], pos[1]+1)]:
-            new_pos.append((pos[0], pos[1]+1))
-        return new_pos
+        return [n for n in self.grid.neighbors(pos) if not self.grid[n]]
 
 
-if __name__ == "__main__":
-    filename = 'input/Day21.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> Garden:
+    return Garden(data)
 
-    garden = Garden(data)
 
-    # Part 1
+def part1(garden: Garden) -> int:
     max_steps = 64
-    reachable = sum([garden.bfs(garden.start, distance) for distance in range(0, max_steps + 1, 2)])
-    print(f"The answer to Part 1 is {reachable}")
+    return sum([garden.bfs(garden.start, distance) for distance in range(0, max_steps + 1, 2)])
 
-    # Part 2
+
+def part2(garden: Garden) -> int:
     all_odd = sum([garden.bfs(garden.start, distance) for distance in range(0, garden.max_x + 1, 2)])
     all_even = sum([garden.bfs(garden.start, distance) for distance in range(1, garden.max_x + 1, 2)])
 
@@ -81,5 +68,15 @@ if __name__ == "__main__":
                    sum([garden.bfs(garden.start, distance) for distance in range(1, garden.max_x // 2 + 1, 2)])
 
     n = (26501365 - (garden.max_x // 2)) / (garden.max_x + 1)
-    total = int((n+1)**2 * all_odd + n**2 * all_even - (n+1) * corners_odd + n * corners_even)
-    print(f"The answer to Part 2 is {total}")
+    return int((n+1)**2 * all_odd + n**2 * all_even - (n+1) * corners_odd + n * corners_even)
+
+
+if __name__ == "__main__":
+    filename = 'input/Day21.txt'
+    garden = parse_input(read_input(filename))
+
+    # Part 1
+    print(f"The answer to Part 1 is {part1(garden)}")
+
+    # Part 2
+    print(f"The answer to Part 2 is {part2(garden)}")
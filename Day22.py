@@ -4,8 +4,9 @@ import ast
 from typing import List
 from queue import Queue
 
-from shapely.geometry import LineString, Point
-from utils import read_file, XYZ
+from utils import read_file, XYZ, lazy_import
+
+geometry = lazy_import('shapely.geometry')
 
 
 class Brick:
@@ -20,9 +21,9 @@ class Brick:
 
     @property
     def xy_point_or_segment(self):
-        return Point(self.start.x, self.start.y) if \
+        return geometry.Point(self.start.x, self.start.y) if \
             self.start.x == self.end.x and self.start.y == self.end.y else \
-            LineString([(self.start.x, self.start.y), (self.end.x, self.end.y)])
+            geometry.LineString([(self.start.x, self.start.y), (self.end.x, self.end.y)])
 
     @property
     def minimum(self):
@@ -71,7 +72,7 @@ class Stack:
         for essential in essentials:
             queue = Queue()
             queue.put(essential)
-            resting_on = {brick.id: brick.resting_on.copy() for brick in stack.bricks}
+            resting_on = {brick.id: brick.resting_on.copy() for brick in self.bricks}
             while not queue.empty():
                 falling_brick = queue.get()
                 for supported_brick in falling_brick.supporting:
@@ -107,12 +108,25 @@ class Stack:
         [brick.determine_disintegratability() for brick in self.bricks]
 
 
+def parse_input(data: List[str]) -> Stack:
+    # Both parts work on the settled stack so let the bricks fall once up front
+    stack = Stack(data)
+    stack.let_bricks_fall()
+    return stack
+
+
+def part1(stack: Stack) -> int:
+    return sum([brick.disintegratable for brick in stack.bricks])
+
+
+def part2(stack: Stack) -> int:
+    return stack.answer_pt2
+
+
 if __name__ == "__main__":
     filename = 'input/Day22.txt'
-    data = read_file(filename)
+    stack = parse_input(read_file(filename))
 
-    stack = Stack(data)
-    stack.let_bricks_fall()
-    print(f"The answer to Part 1 is {sum([brick.disintegratable for brick in stack.bricks])}")
+    print(f"The answer to Part 1 is {part1(stack)}")
 
-    print(f"The answer to Part 2 is {stack.answer_pt2}")
\ No newline at end of file
+    print(f"The answer to Part 2 is {part2(stack)}")
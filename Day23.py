@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from typing import Tuple, Dict, Set
+from typing import List, Tuple, Dict, Set
 from queue import Queue
 
-from utils import read_file, Part
+from utils import read_input, Grid, Part
 
 
 class Graph:
@@ -12,8 +12,8 @@ class Graph:
     def __init__(self, data, part: Part):
         self.part = part
         self.deltas = {'<': (0, -1), '>': (0, 1), '^': (-1, 0), 'v': (1, 0)}
-        self.grid = [[ele for ele in line] for line in data]
-        self.dimensions = (len(data), len(data[0]))
+        self.grid = Grid.from_lines(data)
+        self.dimensions = self.grid.shape
         self.graph: Dict[Tuple[int, int]: Set[Tuple[int, int]]] = {}
         self.populate_graph(data)
         self.start = (0, 1)
@@ -53,8 +53,8 @@ class Graph:
     def populate_graph(self, data):
         for i in range(len(data)):
             for j in range(len(data[0])):
-                if self.grid[i][j] != '#':
-                    neighbors = self.get_neighbors(i, j, self.grid[i][j])
+                if self.grid.char((i, j)) != '#':
+                    neighbors = self.get_neighbors(i, j, self.grid.char((i, j)))
                     for n in neighbors:
                         self.add_edge((i, j), n)
 
@@ -66,15 +66,15 @@ class Graph:
         # Otherwise look around
         neighbors = [(row + 1, col), (row -1, col), (row, col + 1), (row, col -1)]
         # Strip out points off the grid
-        neighbors = [n for n in neighbors if 0 <= n[0] < self.dimensions[0] and 0 <= n[1] < self.dimensions[1]]
+        neighbors = [n for n in neighbors if self.grid.in_bounds(n)]
         # Strip out rocks
-        neighbors = [n for n in neighbors if self.grid[n[0]][n[1]] != '#']
+        neighbors = [n for n in neighbors if self.grid.char(n) != '#']
         if self.part == Part.PT2:
             return neighbors
         # For part 1 we strip out neighbors that are uphill
         new_neighbors = set()
         for n in neighbors:
-            val = self.grid[n[0]][n[1]]
+            val = self.grid.char(n)
             if val == '.':
                 new_neighbors.add(n)
             elif val in self.ARROWS:
@@ -101,14 +101,24 @@ class Graph:
         return max_dist
 
 
-if __name__ == "__main__":
-    filename = 'input/Day23.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[str]:
+    return data
+
 
+def part1(data: List[str]) -> int:
     graph = Graph(data, Part.PT1)
-    dist = graph.dfs((0, 1))
-    print(f"The answer to Part 1 is {dist}")
+    return graph.dfs(graph.start)
 
+
+def part2(data: List[str]) -> int:
     graph = Graph(data, Part.PT2)
-    dist = graph.dfs((0, 1))
-    print(f"The answer to Part 1 is {dist}")
+    return graph.dfs(graph.start)
+
+
+if __name__ == "__main__":
+    filename = 'input/Day23.txt'
+    data = parse_input(read_input(filename))
+
+    print(f"The answer to Part 1 is {part1(data)}")
+
+    print(f"The answer to Part 1 is {part2(data)}")
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from utils import read_file, Part
+from utils import read_file, Part, lazy_import
 from typing import List, Tuple
-import numpy as np
+
+np = lazy_import('numpy')
 
 SCALING = 1_000_000_000
+LIMITS = (200000000000000, 400000000000000)
 
 
 class Area:
@@ -18,7 +20,7 @@ class Area:
         for i in range(len(self.hailstones)):
             for j in range(i + 1, len(self.hailstones)):
                 intersections[f"{i}-{j}"] = \
-                    self.hailstones[i].intersect(self.hailstones[j], limits)
+                    self.hailstones[i].intersect(self.hailstones[j], self.limits)
         return len([v for v in intersections.values() if v])
 
     def find_stone(self):
@@ -98,13 +100,24 @@ class Hailstone:
             return self.z * self.vx - other.z * other.vx + other.x * other.vz - self.x * self.vz
 
 
+def parse_input(data: List[str]) -> List[str]:
+    return data
+
+
+def part1(data: List[str]) -> int:
+    return Area(LIMITS, data, Part.PT1).get_intersections()
+
+
+def part2(data: List[str]) -> int:
+    # find_stone rescales the hailstones in place so it gets its own Area
+    return Area(LIMITS, data, Part.PT2).find_stone()
+
+
 if __name__ == "__main__":
     filename = 'input/Day24.txt'
-    data = read_file(filename)
+    data = parse_input(read_file(filename))
 
-    limits = (200000000000000, 400000000000000)
-    area = Area(limits, data, Part.PT1)
-    print(f"The answer to part 1 is {area.get_intersections()}")
+    print(f"The answer to part 1 is {part1(data)}")
 
     # Part 2
     # I got pretty far on my own.  I was able to find for the sample data the correct
@@ -115,5 +128,4 @@ if __name__ == "__main__":
     # need.  So if I had just reduced the number of hailstones I was looking at I think
     # that approach could have worked although it would have been slow. But I lost faith
     # and looked at other solutions, and in the end solved two linear equations.
-    print(f"The answer to part 2 is {area.find_stone()}")
-
+    print(f"The answer to part 2 is {part2(data)}")
@@ -4,19 +4,20 @@ from utils import read_file
 from collections import defaultdict
 import random
 import copy
+from typing import Dict, List, Set
 
 
-if __name__ == "__main__":
-    filename = 'input/Day25.txt'
-    data = read_file(filename)
-
+def parse_input(data: List[str]) -> Dict[str, Set[str]]:
     orig_graph = defaultdict(set)
     for line in data:
         pts = line.split(':')
         for n in pts[1].split():
             orig_graph[pts[0]].add(n)
             orig_graph[n].add(pts[0])
+    return orig_graph
 
+
+def part1(orig_graph: Dict[str, Set[str]]) -> int:
     connections = []
     while len(connections) != 3:
         absorbed = defaultdict(set)
@@ -56,4 +57,11 @@ if __name__ == "__main__":
             for n in orig_graph[node]:
                 if n in groups[1]:
                     connections.append(f"{node}-{n}")
-    print(f"The answer to Part 1 is {len(groups[0])*len(groups[1])}.")
+    return len(groups[0]) * len(groups[1])
+
+
+if __name__ == "__main__":
+    filename = 'input/Day25.txt'
+    orig_graph = parse_input(read_file(filename))
+
+    print(f"The answer to Part 1 is {part1(orig_graph)}.")
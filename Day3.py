@@ -1,9 +1,10 @@
-from utils import read_file
-from typing import Dict, List
+from utils import read_file, Grid, lazy_import
+from typing import List
 from utils import CharReplacer
-import numpy as np
 from utils import find_exact_match
 
+np = lazy_import('numpy')
+
 SYMBOLS = '@#$%&*/+=-'
 
 
@@ -11,18 +12,17 @@ class Schematic:
     def __init__(self, data: str):
         self.char_replacer = CharReplacer(SYMBOLS + '.')
         self.lines = [line for line in data]
-        self.grid = {i: {j: c for j, c in enumerate(line)} for i, line in enumerate(data)}
-        self.max_x = len(self.grid[0])
-        self.max_y = len(self.grid)
+        self.grid = Grid.from_lines(data)
+        self.max_x = self.grid.width
+        self.max_y = self.grid.height
         self.numbers = self.__get_numbers()
         self.loc_to_numbers = {(num.x, num.y): num.value for num in self.numbers}
         self.gears = self.__get_gears()
 
     def __get_gears(self):
         gears = [Gear(i, j, nums)
-                 for i in range(self.max_x)
-                 for j in range(self.max_y)
-                 if self.grid[i][j] == '*' and (nums := self.__get_touching_numbers(i, j))]
+                 for i, j in zip(*np.nonzero(self.grid.cells == ord('*')))
+                 if (nums := self.__get_touching_numbers(i, j))]
         return gears
 
     def __check_points(self, points: List, num_length: int) -> List:
@@ -78,10 +78,10 @@ class Gear:
 
 
 class Number:
-    def __init__(self, grid: Dict, row: int, col: int, word: str):
+    def __init__(self, grid: Grid, row: int, col: int, word: str):
         self.grid = grid
-        self.max_x = len(self.grid[0])
-        self.max_y = len(self.grid)
+        self.max_x = grid.width
+        self.max_y = grid.height
         self.x = row
         self.y = col
         self.length = len(word)
@@ -109,13 +109,24 @@ class Number:
         pts_to_check.append((row, col + self.length))
 
         for pt in pts_to_check:
-            if (val := self.grid.get(pt[0], {}).get(pt[1])) and val in SYMBOLS:
+            if (val := self.grid.get(pt)) and chr(val) in SYMBOLS:
                 return True
 
 
+def parse_input(data: List[str]) -> Schematic:
+    return Schematic(data)
+
+
+def part1(schematic: Schematic) -> int:
+    return schematic.answer_pt1()
+
+
+def part2(schematic: Schematic) -> int:
+    return schematic.answer_pt2()
+
+
 if __name__ == '__main__':
     filename = 'input/Day3.txt'
-    data = read_file(filename)
-    schematic = Schematic(data)
-    print(f"The answer to part 1 is {schematic.answer_pt1()}")
-    print(f"The answer to part 2 is {schematic.answer_pt2()}")
+    schematic = parse_input(read_file(filename))
+    print(f"The answer to part 1 is {part1(schematic)}")
+    print(f"The answer to part 2 is {part2(schematic)}")
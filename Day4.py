@@ -1,5 +1,6 @@
 from utils import read_file
-from typing import List
+from typing import Iterable, List
+from collections import deque
 
 
 class Game:
@@ -19,6 +20,9 @@ class Game:
         return sum([card.count for card in self.cards])
 
     def play(self):
+        # Start from a single copy of each card so that replaying is idempotent
+        for card in self.cards:
+            card.count = 1
         card_num = 0
         while card_num < self.num_cards:
             card = self.cards[card_num]
@@ -45,15 +49,39 @@ class Card:
         return int(2**(self.num_winning_numbers - 1))
 
 
-if __name__ == '__main__':
-    filename = 'input/Day4.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> Game:
+    return Game(data)
+
 
-    game = Game(data)
-    print(f"The answer to part 1 is {game.answer_pt1}")
+def part1(game: Game) -> int:
+    return game.answer_pt1
 
+
+def part2(game: Game) -> int:
     game.play()
-    print(f"The answer to part 2 is {game.answer_pt2}")
+    return game.answer_pt2
+
+
+def stream(lines: Iterable[str]) -> List[int]:
+    # Copies only ever go to the next few cards, so we just keep the copies
+    # still owed to the cards coming up
+    total_value, total_count = 0, 0
+    copies = deque()
+    for line in lines:
+        card = Card(line)
+        card.count += copies.popleft() if copies else 0
+        total_value += card.value
+        total_count += card.count
+        num_winning_numbers = card.num_winning_numbers
+        copies.extend([0] * (num_winning_numbers - len(copies)))
+        for ind in range(num_winning_numbers):
+            copies[ind] += card.count
+    return [total_value, total_count]
 
 
+if __name__ == '__main__':
+    filename = 'input/Day4.txt'
+    game = parse_input(read_file(filename))
+    print(f"The answer to part 1 is {part1(game)}")
 
+    print(f"The answer to part 2 is {part2(game)}")
@@ -1,7 +1,16 @@
-from utils import read_file
-from typing import List, Dict
-from utils import get_range_intersection
-from queue import Queue
+from __future__ import annotations
+
+from utils import read_file, lazy_import
+from typing import List, Dict, Tuple
+from utils import IntervalSet
+import bisect
+
+np = lazy_import('numpy')
+
+# Ends of the number line as far as the composed map is concerned; they fit
+# in an int64 so the breakpoints can go straight into numpy
+LOWEST = -(1 << 62)
+HIGHEST = 1 << 62
 
 
 class Almanac:
@@ -18,49 +27,99 @@ class Almanac:
             line_num += 1
         seed_nums = [int(word) for word in data[0].split(':')[1].split()]
         self.seeds = [Seed(seed_num, self.maps) for seed_num in seed_nums]
+        self.rules = {map_type: get_rules(lines) for map_type, lines in self.maps.items()}
         self.seed_ranges = [
-                SeedRange(range(seed_nums[ind], seed_nums[ind] + seed_nums[ind + 1]), self.maps) for
+                SeedRange(range(seed_nums[ind], seed_nums[ind] + seed_nums[ind + 1]), self.rules) for
                 ind in range(0, len(seed_nums), 2)
             ]
+        self.seed_nums = seed_nums
+        self.location_map = PiecewiseMap.compose([PiecewiseMap.from_rules(rules) for rules in self.rules.values()])
+
+
+class PiecewiseMap:
+    # A map from numbers to numbers that adds offsets[i] to anything in
+    # [starts[i], starts[i + 1]) (the last piece runs on forever). All the
+    # almanac's maps compose into one of these, so a seed goes to its location
+    # with a single binary search rather than through every map in turn.
+    def __init__(self, starts: List[int], offsets: List[int]):
+        self.starts = []
+        self.offsets = []
+        # Neighbouring pieces with the same offset are really one piece
+        for start, offset in zip(starts, offsets):
+            if self.offsets and self.offsets[-1] == offset:
+                continue
+            self.starts.append(start)
+            self.offsets.append(offset)
+        self.start_array = None
+        self.offset_array = None
+
+    @classmethod
+    def from_rules(cls, rules: List[Tuple[int, int, int]]) -> PiecewiseMap:
+        starts, offsets = [LOWEST], [0]
+        for start, stop, offset in sorted(rules):
+            if start == starts[-1]:
+                offsets[-1] = offset
+            else:
+                starts.append(start)
+                offsets.append(offset)
+            starts.append(stop)
+            offsets.append(0)
+        return cls(starts, offsets)
+
+    @classmethod
+    def compose(cls, maps: List[PiecewiseMap]) -> PiecewiseMap:
+        # The map that applies each of maps in turn
+        composed = cls([LOWEST], [0])
+        for piecewise_map in maps:
+            composed = composed.then(piecewise_map)
+        return composed
+
+    def stop(self, ind: int) -> int:
+        return self.starts[ind + 1] if ind + 1 < len(self.starts) else HIGHEST
+
+    def then(self, other: PiecewiseMap) -> PiecewiseMap:
+        # Each of our pieces lands somewhere in other, which may split it
+        starts, offsets = [], []
+        for ind, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            stop = self.stop(ind)
+            other_ind = bisect.bisect_right(other.starts, start + offset) - 1
+            pos = start
+            while pos < stop:
+                starts.append(pos)
+                offsets.append(offset + other.offsets[other_ind])
+                pos = min(stop, other.stop(other_ind) - offset)
+                other_ind += 1
+        return PiecewiseMap(starts, offsets)
+
+    def lookup(self, num: int) -> int:
+        return num + self.offsets[bisect.bisect_right(self.starts, num) - 1]
+
+    def lookup_many(self, nums: np.ndarray) -> np.ndarray:
+        # Every number in one go
+        if self.start_array is None:
+            self.start_array = np.array(self.starts, dtype=np.int64)
+            self.offset_array = np.array(self.offsets, dtype=np.int64)
+        nums = np.asarray(nums, dtype=np.int64)
+        return nums + self.offset_array[np.searchsorted(self.start_array, nums, side='right') - 1]
+
+    def image(self, nums: IntervalSet) -> IntervalSet:
+        # Where a whole set of numbers ends up, in one sweep
+        rules = [(start, self.stop(ind), offset) for ind, (start, offset) in enumerate(zip(self.starts, self.offsets))
+                 if offset]
+        return nums.translate(rules)
 
 
 class SeedRange:
-    def __init__(self, seed_range: range, maps: Dict):
+    def __init__(self, seed_range: range, rules: Dict):
         self.seed_range = seed_range
-        self.maps = maps
+        self.rules = rules
 
     @property
     def min_location(self):
-        results = [self.seed_range]
-        for map_type, lines in self.maps.items():
-            results = self.process_map(lines, results)
-        return min([r.start for r in results])
-
-    @staticmethod
-    def process_map(lines: List, results: List[range]):
-        queue = Queue()
-        [queue.put(r) for r in results]
-        results = []
-        for line in lines:
-            unmatched = []
-            while not queue.empty():
-                r = queue.get()
-                left, middle, right = \
-                    get_range_intersection(r, range(line.source, line.source + line.range))
-                if left:
-                    unmatched.append(left)
-                if right:
-                    unmatched.append(right)
-                if middle:
-                    results.append(range(line.dest + middle.start - line.source,
-                                         line.dest + middle.stop - line.source))
-            for r in unmatched:
-                queue.put(r)
-
-        while not queue.empty():
-            results.append(queue.get())
-
-        return results
+        results = IntervalSet([self.seed_range])
+        for map_type, rules in self.rules.items():
+            results = results.translate(rules)
+        return results.start
 
 
 class Seed:
@@ -91,13 +150,42 @@ class Line:
         self.range = pts[2]
 
 
-if __name__ == '__main__':
-    filename = 'input/Day5.txt'
-    data = read_file(filename)
+def get_rules(lines: List[Line]) -> List[Tuple[int, int, int]]:
+    # Each line as a (start, stop, offset) rule for IntervalSet.translate. If
+    # lines overlap the first one wins, so later lines lose what's already covered.
+    rules = []
+    covered = IntervalSet()
+    for line in lines:
+        source = IntervalSet([range(line.source, line.source + line.range)])
+        rules.extend((start, stop, line.dest - line.source) for start, stop in source - covered)
+        covered = covered | source
+    return rules
+
 
-    almanac = Almanac(data)
-    print(f"The answer to part 1 is {min([seed.location for seed in almanac.seeds])}")
-    print(f"The answer to part 2 is {min([seed.min_location for seed in almanac.seed_ranges])}")
+def parse_input(data: List[str]) -> Almanac:
+    return Almanac(data)
 
 
+def part1(almanac: Almanac) -> int:
+    return int(almanac.location_map.lookup_many(almanac.seed_nums).min())
+
+
+def part2(almanac: Almanac) -> int:
+    seed_ranges = IntervalSet([seed_range.seed_range for seed_range in almanac.seed_ranges])
+    return almanac.location_map.image(seed_ranges).start
+
+
+def part1_by_stage(almanac: Almanac) -> int:
+    return min([seed.location for seed in almanac.seeds])
+
+
+def part2_by_stage(almanac: Almanac) -> int:
+    return min([seed.min_location for seed in almanac.seed_ranges])
+
+
+if __name__ == '__main__':
+    filename = 'input/Day5.txt'
+    almanac = parse_input(read_file(filename))
 
+    print(f"The answer to part 1 is {part1(almanac)}")
+    print(f"The answer to part 2 is {part2(almanac)}")
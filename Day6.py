@@ -1,7 +1,11 @@
-from utils import read_file
-import numpy as np
+from __future__ import annotations
+
+from utils import read_file, lazy_import
+from typing import List, Tuple
 import math
 
+np = lazy_import('numpy')
+
 
 class Race:
     def __init__(self, time: int, record: int):
@@ -10,11 +14,11 @@ class Race:
 
     @property
     def total_wins(self):
-        return sum(self.wins)
+        return count_wins(self.time, self.record)
 
     @property
     def wins(self):
-        return [self.possible_distances[i] > self.record for i in range(self.time + 1)]
+        return [distance > self.record for distance in self.possible_distances]
 
     @property
     def possible_distances(self):
@@ -24,21 +28,65 @@ class Race:
         return hold * (self.time - hold)
 
 
-if __name__ == '__main__':
-    filename = 'input/Day6.txt'
-    data = read_file(filename)
+def count_wins(time: int, record: int) -> int:
+    # Holding for h wins when h * (time - h) > record. The distances are
+    # symmetric about time / 2 so once we have the shortest winning hold the
+    # longest is time minus it. The roots of h * (time - h) = record are
+    # (time +- sqrt(time**2 - 4 * record)) / 2, worked out exactly with isqrt.
+    discriminant = time * time - 4 * record
+    if discriminant <= 0:
+        return 0
+    shortest = max(0, (time - math.isqrt(discriminant)) // 2)
+    # isqrt rounds down, which can leave us one short of a winning hold
+    while shortest <= time - shortest and shortest * (time - shortest) <= record:
+        shortest += 1
+    return max(0, time - 2 * shortest + 1)
+
+
+def count_wins_many(times: np.ndarray, records: np.ndarray) -> np.ndarray:
+    # count_wins for whole arrays of races at once. Everything is int64, so
+    # time**2 has to fit in one.
+    times = np.asarray(times, dtype=np.int64)
+    records = np.asarray(records, dtype=np.int64)
+    discriminant = times * times - 4 * records
+    positive = discriminant > 0
+    discriminant = np.where(positive, discriminant, 0)
+    # The float square root can be out by one either way so fix it up
+    root = np.sqrt(discriminant.astype(float)).astype(np.int64)
+    root -= root * root > discriminant
+    root += (root + 1) * (root + 1) <= discriminant
+    shortest = np.maximum(0, (times - root) // 2)
+    losing = (shortest <= times - shortest) & (shortest * (times - shortest) <= records)
+    while losing.any():
+        shortest += losing
+        losing = (shortest <= times - shortest) & (shortest * (times - shortest) <= records)
+    return np.where(positive, np.maximum(0, times - 2 * shortest + 1), 0)
+
 
+def parse_input(data: List[str]) -> Tuple[List[Race], Race]:
     times = [int(word) for word in data[0].replace("Time:", "").split()]
     records = [int(word) for word in data[1].replace("Distance:", "").split()]
-
     races = [Race(times[i], records[i]) for i in range(len(times))]
-    print(f"The answer to part 1 is {np.prod([race.total_wins for race in races])}")
 
+    # For part 2 the spaces between the numbers are ignored
     time = int(data[0].replace("Time:", "").replace(" ", ""))
     record = int(data[1].replace("Distance:", "").replace(" ", ""))
-    min_time_to_win = math.ceil(-np.sqrt((time/2)**2 - record) + time/2)
-    max_time_to_win = int(np.sqrt((time/2)**2 - record) + time/2)
-    print(f"The answer to part 2 is {max_time_to_win - min_time_to_win + 1}")
+    return races, Race(time, record)
+
+
+def part1(parsed: Tuple[List[Race], Race]) -> int:
+    races, _ = parsed
+    return math.prod([race.total_wins for race in races])
+
 
+def part2(parsed: Tuple[List[Race], Race]) -> int:
+    _, race = parsed
+    return race.total_wins
 
 
+if __name__ == '__main__':
+    filename = 'input/Day6.txt'
+    parsed = parse_input(read_file(filename))
+
+    print(f"The answer to part 1 is {part1(parsed)}")
+    print(f"The answer to part 2 is {part2(parsed)}")
@@ -1,5 +1,5 @@
 from utils import read_file, Part
-from typing import List
+from typing import Iterable, List, Tuple
 from collections import Counter, defaultdict
 from enum import Enum, auto
 
@@ -66,18 +66,52 @@ class Game:
                 hand.rank = highest_rank
 
 
-if __name__ == '__main__':
-    filename = 'input/Day7.txt'
-    data = read_file(filename)
+def parse_input(data: List[str]) -> List[Tuple[str, int]]:
+    return [(line.split()[0], int(line.split()[1])) for line in data]
 
-    game = Game([Hand(line.split()[0], int(line.split()[1]), Part.PT1) for line in data], Part.PT1)
-    game.rank_hands()
-    print(f"The answer to part 1 is {sum([(hand.bid * hand.rank) for hand in game.hands])}")
 
-    game = Game([Hand(line.split()[0], int(line.split()[1]), Part.PT2) for line in data], Part.PT2)
+def total_winnings(hands: List[Tuple[str, int]], part: Part) -> int:
+    game = Game([Hand(cards, bid, part) for cards, bid in hands], part)
     game.rank_hands()
-    print(f"The answer to part 2 is {sum([(hand.bid * hand.rank) for hand in game.hands])}")
+    return sum([(hand.bid * hand.rank) for hand in game.hands])
+
+
+def part1(hands: List[Tuple[str, int]]) -> int:
+    return total_winnings(hands, Part.PT1)
+
 
+def part2(hands: List[Tuple[str, int]]) -> int:
+    return total_winnings(hands, Part.PT2)
 
 
+def stream(lines: Iterable[str]) -> List[int]:
+    # Only the distinct hands are kept and there are at most 13**5 of them.
+    # Copies of a hand rank one after the other in the order they were dealt,
+    # so for each hand we keep how many were dealt, their total bid and the sum
+    # of each bid times the number of copies dealt before it.
+    dealt = {}
+    for line in lines:
+        cards, bid = parse_input([line])[0]
+        count, bids, weighted_bids = dealt.get(cards, (0, 0, 0))
+        dealt[cards] = (count + 1, bids + bid, weighted_bids + bid * count)
+
+    answers = []
+    for part in Part:
+        game = Game([Hand(cards, 0, part) for cards in dealt], part)
+        game.rank_hands()
+        total, ranked = 0, 0
+        for hand in sorted(game.hands, key=lambda x: x.rank):
+            count, bids, weighted_bids = dealt[hand.dealt_cards]
+            total += bids * (ranked + 1) + weighted_bids
+            ranked += count
+        answers.append(total)
+    return answers
+
+
+if __name__ == '__main__':
+    filename = 'input/Day7.txt'
+    hands = parse_input(read_file(filename))
+
+    print(f"The answer to part 1 is {part1(hands)}")
 
+    print(f"The answer to part 2 is {part2(hands)}")
@@ -1,5 +1,5 @@
 from utils import read_file, Part
-from typing import List, Callable
+from typing import List, Callable, Tuple
 import math
 
 
@@ -41,14 +41,24 @@ class Map:
         return steps
 
 
+def parse_input(data: List[str]) -> Tuple[str, List[Node]]:
+    return data[0], [Node(line) for line in data[2:]]
+
+
+def part1(parsed: Tuple[str, List[Node]]) -> int:
+    instructions, nodes = parsed
+    return Map(instructions, nodes, Part.PT1).get_steps()[0]
+
+
+def part2(parsed: Tuple[str, List[Node]]) -> int:
+    instructions, nodes = parsed
+    return math.lcm(*Map(instructions, nodes, Part.PT2).get_steps())
+
+
 if __name__ == '__main__':
     filename = 'input/Day8.txt'
-    data = read_file(filename)
-    instructions = data[0]
-    nodes = [Node(line) for line in data[2:]]
+    parsed = parse_input(read_file(filename))
 
-    steps = Map(instructions, nodes, Part.PT1).get_steps()
-    print(f"The answer to part 1 is {steps[0]}.")
+    print(f"The answer to part 1 is {part1(parsed)}.")
 
-    steps = Map(instructions, nodes, Part.PT2).get_steps()
-    print(f"The answer to part 2 is {math.lcm(*steps)}.")
+    print(f"The answer to part 2 is {part2(parsed)}.")
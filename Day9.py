@@ -1,5 +1,5 @@
-from utils import read_file, Part
-from typing import List
+from utils import read_file, sum_by_line, Part
+from typing import Iterable, List
 
 
 class Report:
@@ -42,15 +42,30 @@ class Report:
                 bottom_row = curr_row
 
 
-if __name__ == '__main__':
-    filename = 'input/Day9.txt'
-    data = read_file(filename)
-    converted_data = [[int(ele) for ele in line.split()] for line in data]
+def parse_input(data: List[str]) -> List[List[int]]:
+    return [[int(ele) for ele in line.split()] for line in data]
+
 
+def part1(converted_data: List[List[int]]) -> int:
     report = Report(converted_data, Part.PT1)
     report.get_differences().extrapolate()
-    print(f"The answer to part 1 is {report.answer}.")
+    return report.answer
 
+
+def part2(converted_data: List[List[int]]) -> int:
     report = Report(converted_data, Part.PT2)
     report.get_differences().extrapolate()
-    print(f"The answer to part 2 is {report.answer}.")
+    return report.answer
+
+
+def stream(lines: Iterable[str]) -> List[int]:
+    return sum_by_line(lines, parse_input, [part1, part2])
+
+
+if __name__ == '__main__':
+    filename = 'input/Day9.txt'
+    converted_data = parse_input(read_file(filename))
+
+    print(f"The answer to part 1 is {part1(converted_data)}.")
+
+    print(f"The answer to part 2 is {part2(converted_data)}.")
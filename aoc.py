@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from utils import DAY_MODULES, DAYS, ROOT, input_path, load_day, process_pool, read_input, stream_lines
+
+TIMINGS_FILE = 'timings.json'
+
+
+class InputCache:
+    # Parsed inputs keyed by day and the hash of the file they came from, so a
+    # batch pays for reading and parsing each input once however many parts
+    # (or repeated runs) use it
+    def __init__(self):
+        self.parsed: Dict[Tuple[int, str], object] = {}
+
+    def get(self, day: int, filename: str):
+        with open(filename, 'rb') as f:
+            key = (day, hashlib.file_digest(f, 'sha256').hexdigest())
+        if key not in self.parsed:
+            self.parsed[key] = load_day(day).parse_input(read_input(filename))
+        return self.parsed[key]
+
+
+# Each process (the main one or a pool worker) keeps its own cache
+cache = InputCache()
+
+
+def solve(day: int, part: int, input_dir: str = 'input') -> Tuple[object, float, float]:
+    start = time.perf_counter()
+    parsed = cache.get(day, input_path(day, input_dir))
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    answer = getattr(load_day(day), f'part{part}')(parsed)
+    return answer, parse_time, time.perf_counter() - start
+
+
+def job_key(day: int, part: int) -> str:
+    return f'{day}.{part}'
+
+
+def load_timings(filename: str) -> Dict[str, Dict[str, float]]:
+    # Job times from earlier runs, kept apart by whether the job ran on its
+    # own ('serial') or in a pool ('pool'), where it competes for the CPU
+    try:
+        with open(filename) as f:
+            timings = json.load(f)
+    except (OSError, ValueError):
+        timings = {}
+    if not all(isinstance(value, dict) for value in timings.values()):
+        # An old flat file: where its times came from is anyone's guess
+        timings = {'pool': {key: value for key, value in timings.items() if not isinstance(value, dict)}}
+    return {'serial': timings.get('serial', {}), 'pool': timings.get('pool', {})}
+
+
+def save_timings(filename: str, timings: Dict[str, Dict[str, float]]):
+    with open(filename, 'w') as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+
+
+def run(days: List[int], parts: List[int], input_dir: str = 'input', workers: int = None,
+        timings_file: str = None) -> List[Tuple[int, int, object, float]]:
+    jobs = [(day, part) for day in days for part in parts if hasattr(load_day(day), f'part{part}')]
+    timings_file = timings_file or os.path.join(input_dir, TIMINGS_FILE)
+    timings = load_timings(timings_file)
+
+    def expected(job: Tuple[int, int]) -> float:
+        key = job_key(*job)
+        return timings['serial'].get(key, timings['pool'].get(key, math.inf))
+
+    start = time.perf_counter()
+    if workers:
+        # Longest jobs first so the slow days don't end up running on their own
+        # at the end. Jobs we have never timed are assumed to be slow.
+        ordered = sorted(jobs, key=lambda job: -expected(job))
+        executor = process_pool(workers)
+        futures = {job: executor.submit(solve, *job, input_dir) for job in ordered}
+    else:
+        executor, futures = None, {}
+
+    results = []
+    # What the jobs took on their own, from the last serial run, before this run overwrites it
+    serial = {job_key(day, part): timings['serial'].get(job_key(day, part)) for day, part in jobs}
+    for day, part in jobs:
+        answer, parse_time, solve_time = \
+            futures[(day, part)].result() if workers else solve(day, part, input_dir)
+        elapsed = parse_time + solve_time
+        print(f"Day {day} part {part}: {answer} ({elapsed:.3f}s, parse {parse_time:.3f}s)", flush=True)
+        results.append((day, part, answer, elapsed))
+        timings['pool' if workers else 'serial'][job_key(day, part)] = elapsed
+    if executor:
+        executor.shutdown()
+    wall_time = time.perf_counter() - start
+
+    total = sum(result[3] for result in results)
+    summary = f"Ran {len(results)} jobs in {wall_time:.3f}s with {workers or 1} worker(s)"
+    if not workers:
+        print(summary)
+    elif None not in serial.values():
+        # Jobs in a pool slow each other down, so the times measured in there
+        # say nothing about what was saved; compare with them run one by one
+        serial_time = sum(serial.values())
+        print(f"{summary}; one at a time they took {serial_time:.3f}s, a speedup of {serial_time / wall_time:.2f}x")
+    else:
+        print(f"{summary}; their times in the pool add up to {total:.3f}s (not a speedup: "
+              f"run without --workers first to record their serial times)")
+    save_timings(timings_file, timings)
+    return results
+
+
+def stream(day: int, filename: str = '-') -> List[object]:
+    # Days whose lines can be solved one at a time take their input as a
+    # stream, so any size of input (or a pipe) can go through in flat memory
+    answers = load_day(day).stream(stream_lines(filename))
+    for part, answer in enumerate(answers, 1):
+        print(f"Day {day} part {part}: {answer}")
+    return answers
+
+
+def import_times(day: int, repeat: int = 3) -> Dict[str, int]:
+    # Import the day in a fresh interpreter under -X importtime and total the
+    # self time (in microseconds) of everything imported, per top level package.
+    # The best of a few runs keeps disk cache noise out of it.
+    code = f"import importlib; importlib.import_module({DAY_MODULES[day]!r})"
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                                 capture_output=True, text=True, check=True)
+        packages = defaultdict(int)
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_time, _, name = line.split(':', 1)[1].split('|')
+            packages[name.strip().split('.')[0]] += int(self_time)
+        if best is None or sum(packages.values()) < sum(best.values()):
+            best = packages
+    return dict(best)
+
+
+def report_import_times(days: List[int], heavy: List[str], repeat: int = 3):
+    print(f"{'day':>4} {'total (ms)':>11}  " + "".join(f"{name + ' (ms)':>14}" for name in heavy) +
+          "  slowest other imports")
+    for day in days:
+        packages = import_times(day, repeat)
+        others = sorted((name for name in packages if name not in heavy), key=lambda n: -packages[n])[:3]
+        print(f"{day:>4} {sum(packages.values()) / 1000:>11.1f}  " +
+              "".join(f"{packages.get(name, 0) / 1000:>14.1f}" for name in heavy) + "  " +
+              ", ".join(f"{name} {packages[name] / 1000:.1f}" for name in others), flush=True)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(prog='python -m aoc', description='Advent of Code 2023 solutions.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='solve the given days')
+    run_parser.add_argument('days', nargs='*', type=int, default=DAYS, help='days to run (default: all)')
+    run_parser.add_argument('--part', type=int, choices=[1, 2], help='only run this part')
+    run_parser.add_argument('--input-dir', default='input', help='directory holding DayN.txt')
+    run_parser.add_argument('--workers', type=int, nargs='?', const=os.cpu_count(),
+                            help='run the jobs on a process pool of this size (default: one per CPU)')
+    run_parser.add_argument('--timings', help=f'timing history used to order the jobs '
+                                              f'(default: {TIMINGS_FILE} in the input directory)')
+    stream_parser = subparsers.add_parser('stream', help='solve a day line by line from a file or stdin')
+    stream_parser.add_argument('day', type=int, choices=DAYS)
+    stream_parser.add_argument('file', nargs='?', default='-', help='input file (default: stdin)')
+    imports_parser = subparsers.add_parser('imports', help='report how long each day takes to import')
+    imports_parser.add_argument('days', nargs='*', type=int, default=DAYS, help='days to check (default: all)')
+    imports_parser.add_argument('--repeat', type=int, default=3, help='runs per day, the fastest is kept')
+    imports_parser.add_argument('--heavy', nargs='*', default=['numpy', 'pandas', 'shapely'],
+                                help='packages to report on separately')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run(args.days, [args.part] if args.part else [1, 2], args.input_dir, args.workers, args.timings)
+    elif args.command == 'stream':
+        if not hasattr(load_day(args.day), 'stream'):
+            parser.error(f'day {args.day} has no streaming mode')
+        stream(args.day, args.file)
+    elif args.command == 'imports':
+        report_import_times(args.days, args.heavy, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import re
+from enum import Enum
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Iterable, List, Tuple
+
+from utils import lazy_import, process_pool
+
+np = lazy_import('numpy')
+
+# Counting the arrangements of day 12's springs, shared by Day12.py and both
+# of its part 2 variants. There are two backends: a memoised walk over the
+# springs ('dp') and a batch of DFAs run side by side in numpy ('dfa').
+
+# How many distinct (springs, groups) answers count_arrangements keeps
+CACHE_SIZE = 1 << 16
+# The most records counted together. The DFA backend's arrays grow with the
+# chunk, so this is what keeps its memory flat however long the input is.
+CHUNK_SIZE = 1024
+
+MULTIPLE_DOTS = re.compile(r'\.+')
+
+
+class State(Dict, Enum):
+    # this is a state that can take either input.  It circles to itself for a . and advances for a #
+    EITHER = {'.': lambda x: x, '#': lambda x: x + 1}
+    # this is a state that can only take a pound in which case it advances
+    POUND_ONLY = {'#': lambda x: x + 1}
+    # this is a state that can only take a dot in which case it advances
+    DOT_ONLY = {'.': lambda x: x + 1}
+    # this is the final state that can only take a dot and circles to itself
+    FINAL = {'.': lambda x: x}
+
+
+KINDS = list(State)
+# How far each kind of state moves on for each character (-1 if it can't take it)
+STEPS = {ch: [state[ch](0) if ch in state else -1 for state in KINDS] for ch in ['.', '#']}
+
+
+class DFA:
+    # The automaton that accepts exactly the ways of filling in springs that
+    # give runs of # of the lengths in groups
+    def __init__(self, springs: str, groups: List[int]):
+        self.springs = springs
+        self.groups = groups
+        self.states = self.get_states()
+        self.transitions = self.compile()
+
+    def get_states(self) -> List[Dict]:
+        states = [State.EITHER]
+        for g in self.groups[:-1]:
+            for _ in range(g-1):
+                states.append(State.POUND_ONLY)
+            states.append(State.DOT_ONLY)
+            states.append(State.EITHER)
+        for _ in range(self.groups[-1]-1):
+            states.append(State.POUND_ONLY)
+        states.append(State.DOT_ONLY)
+        states.append(State.FINAL)
+        return states
+
+    def compile(self) -> Dict[str, np.ndarray]:
+        # For each character, the state each state moves to (-1 for a dead end)
+        kinds = np.array([KINDS.index(state) for state in self.states])
+        positions = np.arange(len(self.states))
+        steps = {ch: np.array(STEPS[ch])[kinds] for ch in ['.', '#']}
+        return {ch: np.where(steps[ch] >= 0, positions + steps[ch], -1) for ch in ['.', '#']}
+
+    def get_matches(self):
+        return int(count_matches([self])[0])
+
+
+def count_matches(records: List[DFA]) -> np.ndarray:
+    # The number of matches for each record, as Python ints. The counting is
+    # done in int64, which wraps silently, but a record can't match more ways
+    # than 2 ** (number of ?s), so only records with at least 63 ?s can be
+    # wrong. Those are run again in floating point to see how big they are,
+    # and any that don't fit are counted over with Python ints.
+    counts = run_dfas(records, np.int64).astype(object)
+    risky = [row for row, record in enumerate(records) if record.springs.count('?') >= 63]
+    if risky:
+        sizes = run_dfas([records[row] for row in risky], np.float64)
+        huge = [row for row, size in zip(risky, sizes) if size >= 2 ** 62]
+        if huge:
+            counts[huge] = run_dfas([records[row] for row in huge], object)
+    return counts
+
+
+def run_dfas(records: List[DFA], dtype) -> np.ndarray:
+    # Run every record's DFA side by side: one row of state counts per record,
+    # advanced a character at a time with whole-array operations. A state
+    # either stays put or moves on one, so a step is a multiply plus a shift.
+    # Shorter records are padded with '.', which leaves the count in the final
+    # two states alone, and with dead states.
+    num_states = max(len(record.states) for record in records)
+    length = max(len(record.springs) for record in records)
+    tables = {}
+    for ch in ['.', '#']:
+        tables[ch] = np.full((len(records), num_states), -1)
+        for row, record in enumerate(records):
+            tables[ch][row, :len(record.states)] = record.transitions[ch]
+    stay = tables['.'] == np.arange(num_states)
+    advance = {ch: tables[ch] == np.arange(num_states) + 1 for ch in ['.', '#']}
+    # What stays and what moves on for each of '.', '#' and '?' ('#' never stays)
+    stays = np.stack([stay, np.zeros_like(stay), stay]).astype(np.int64)
+    moves = np.stack([advance['.'], advance['#'], advance['.'] | advance['#']]).astype(np.int64)
+    codes = np.frombuffer("".join(record.springs.ljust(length, '.') for record in records).encode(),
+                          dtype=np.uint8).reshape(len(records), length)
+    kinds = np.select([codes == ord('.'), codes == ord('#')], [0, 1], 2)
+
+    rows = np.arange(len(records))
+    counts = np.zeros((len(records), num_states), dtype=dtype)
+    counts[:, 0] = 1
+    shortest = min(len(record.states) for record in records)
+    for col in range(length):
+        # Only states between these two can still matter: nothing gets further
+        # than one state per character, and a state too far from the end of
+        # the shortest DFA to finish in the characters left is a dead end
+        low = max(0, shortest - 2 - (length - col))
+        high = min(num_states, col + 2)
+        if low >= high:
+            # Not even the shortest DFA can finish now, so nothing matches
+            counts[:] = 0
+            break
+        band = counts[:, low:high]
+        moving = band * moves[kinds[:, col], rows, low:high]
+        band *= stays[kinds[:, col], rows, low:high]
+        band[:, 1:] += moving[:, :-1]
+        if high < num_states:
+            counts[:, high] += moving[:, -1]
+
+    # Now our matches are the sum of the state counts for the final two states
+    last = np.array([len(record.states) - 1 for record in records])
+    return counts[rows, last] + counts[rows, last - 1]
+
+
+def count_with_dp(springs: str, groups: Tuple[int, ...]) -> int:
+    # Walk the springs keeping track of which group we're on and how long the
+    # current run of # is. Each state is memoised under a single integer
+    # built from (position, group index, run length); nothing is copied.
+    num_groups, longest = len(groups), max(groups, default=0)
+    memo = {}
+
+    def count(pos: int, group: int, run: int) -> int:
+        if pos == len(springs):
+            if run:
+                return int(group == num_groups - 1 and run == groups[group])
+            return int(group == num_groups)
+        key = (pos * (num_groups + 1) + group) * (longest + 1) + run
+        if key in memo:
+            return memo[key]
+
+        total = 0
+        char = springs[pos]
+        if char != '.' and group < num_groups and run < groups[group]:
+            # Carry on (or start) the current run
+            total += count(pos + 1, group, run + 1)
+        if char != '#':
+            if not run:
+                total += count(pos + 1, group, 0)
+            elif run == groups[group]:
+                # This run is exactly the right length, so close it off
+                total += count(pos + 1, group + 1, 0)
+        memo[key] = total
+        return total
+
+    return count(0, 0, 0)
+
+
+def count_with_dfa(springs: str, groups: Tuple[int, ...]) -> int:
+    return DFA(springs, list(groups)).get_matches()
+
+
+BACKENDS = {'dp': count_with_dp, 'dfa': count_with_dfa}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def cached_count(springs: str, groups: Tuple[int, ...], backend: str) -> int:
+    return BACKENDS[backend](springs, groups)
+
+
+def count_arrangements(springs: str, groups: Tuple[int, ...], backend: str = 'dp') -> int:
+    # The number of ways to fill in the ?s in springs so the runs of # have
+    # the given lengths. Answers are shared between records through a bounded
+    # LRU cache. Runs of dots (and dots at either end) don't change the
+    # answer, so they're squashed first to let more records share.
+    springs = MULTIPLE_DOTS.sub('.', springs).strip('.')
+    return cached_count(springs, tuple(groups), backend)
+
+
+def count_chunk(pairs: List[Tuple[str, Tuple[int, ...]]], backend: str = 'dp') -> List[int]:
+    if backend == 'dfa':
+        # The DFA counts a whole chunk at once, so hand it over in one go
+        return count_matches([DFA(springs, list(groups)) for springs, groups in pairs]).tolist()
+    return [count_arrangements(springs, groups, backend) for springs, groups in pairs]
+
+
+def count_batch(pairs: Iterable[Tuple[str, Tuple[int, ...]]], backend: str = 'dp', workers: int = None,
+                chunksize: int = None) -> List[int]:
+    # The count for each (springs, groups) pair, in order. Records don't
+    # depend on each other, so they're cut into chunks of at most CHUNK_SIZE
+    # (about four per worker when there's a process pool) and, with workers,
+    # spread over the pool, each worker keeping its own cache
+    pairs = list(pairs)
+    chunksize = chunksize or max(1, min(CHUNK_SIZE, -(-len(pairs) // (4 * workers)) if workers else CHUNK_SIZE))
+    chunks = [pairs[start:start + chunksize] for start in range(0, len(pairs), chunksize)]
+    if not workers:
+        return [count for chunk in chunks for count in count_chunk(chunk, backend)]
+    with process_pool(workers) as executor:
+        return [count for counts in executor.map(count_chunk, chunks, repeat(backend)) for count in counts]
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime
+import importlib
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from generators import generate
+from utils import DAYS, ROOT, CircularLinkedList, input_path, load_day, read_file
+
+PHASES = ['parse', 'part1', 'part2']
+# throughput (items a second) is only filled in where a benchmark has a natural
+# item, and expanded (search states) where there's a search
+FIELDS = ['day', 'phase', 'size', 'repeat', 'best', 'mean', 'worst', 'peak_memory', 'answer', 'throughput',
+          'expanded']
+# All-? day 12 records added to every generated input. Unfolded, they have
+# more than 63 ?s, and the first counts past what int64 can hold, which is
+# where the dp and dfa backends' arithmetic could part ways.
+LONG_RECORDS = ['?' * 20 + ' 1,1,1,1', '?' * 12 + ' 1,2']
+
+
+def timed(func: Callable, *args) -> Tuple[object, float]:
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def traced(func: Callable, *args) -> Tuple[object, int]:
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_input(day: int, size: int, seed: int, input_dir: str = None) -> List[str]:
+    return read_file(input_path(day, input_dir)) if input_dir else generate(day, size, seed)
+
+
+def benchmark_day(day: int, data: List[str], size: int, repeat: int, seed: int = 0) -> List[Dict]:
+    module = load_day(day)
+    phases = {'parse': module.parse_input,
+              'part1': module.part1,
+              'part2': getattr(module, 'part2', None)}
+    phases = {phase: func for phase, func in phases.items() if func}
+    parts = [phase for phase in phases if phase != 'parse']
+
+    # Timings come from untraced runs since tracemalloc slows everything down.
+    # Every repeat parses afresh so parts that mutate their input stay honest.
+    times = {phase: [] for phase in phases}
+    answers = {}
+    for _ in range(repeat):
+        random.seed(seed)
+        parsed, elapsed = timed(phases['parse'], data)
+        times['parse'].append(elapsed)
+        for phase in parts:
+            answers[phase], elapsed = timed(phases[phase], parsed)
+            times[phase].append(elapsed)
+
+    # Then one traced run for the peak memory of each phase
+    random.seed(seed)
+    parsed, peak = traced(phases['parse'], data)
+    peaks = {'parse': peak}
+    for phase in parts:
+        _, peaks[phase] = traced(phases[phase], parsed)
+
+    return [{'day': day,
+             'phase': phase,
+             'size': size,
+             'repeat': repeat,
+             'best': min(times[phase]),
+             'mean': statistics.mean(times[phase]),
+             'worst': max(times[phase]),
+             'peak_memory': peaks[phase],
+             'answer': str(answers.get(phase, ''))}
+            for phase in PHASES if phase in phases]
+
+
+def walk(ring: CircularLinkedList):
+    for _ in range(len(ring)):
+        ring.get_next()
+
+
+def benchmark_circular_list(size: int, operations: int, repeat: int, seed: int = 0) -> List[Dict]:
+    # Build a ring of size elements, go all the way round it a step at a time,
+    # then make operations jumps and moves by random offsets of up to size
+    rng = random.Random(seed)
+    nodes = [rng.randrange(size) for _ in range(operations)]
+    offsets = [rng.randrange(-size, size) for _ in range(operations)]
+    phases = {'build': lambda ring: CircularLinkedList(range(size), seed),
+              'walk': walk,
+              'jump': lambda ring: [ring.get_node(offset) for offset in offsets],
+              'move': lambda ring: [ring.move(node, offset) for node, offset in zip(nodes, offsets)]}
+
+    times = {phase: [] for phase in phases}
+    peaks = {}
+    for run in range(repeat + 1):
+        ring = None
+        for phase, func in phases.items():
+            # The last run is traced for memory, the rest are timed
+            if run < repeat:
+                result, elapsed = timed(func, ring)
+                times[phase].append(elapsed)
+            else:
+                result, peaks[phase] = traced(func, ring)
+            ring = result if phase == 'build' else ring
+
+    return [{'day': 'ring',
+             'phase': phase,
+             'size': size,
+             'repeat': repeat,
+             'best': min(times[phase]),
+             'mean': statistics.mean(times[phase]),
+             'worst': max(times[phase]),
+             'peak_memory': peaks[phase],
+             'answer': str(operations) if phase in ['jump', 'move'] else ''}
+            for phase in phases]
+
+
+def benchmark_arrangements(size: int, repeat: int, seed: int = 0, workers: int = None,
+                           chunksize: int = None) -> List[Dict]:
+    # Count the unfolded records of a generated day 12 input with each
+    # count_arrangements backend, on a process pool if workers is given.
+    # The backends must agree record by record, including LONG_RECORDS.
+    day12 = importlib.import_module('Day12')
+    arrangements = importlib.import_module('arrangements')
+    pairs = [record.unfold().pair() for record in day12.parse_input(generate(12, size, seed) + LONG_RECORDS)]
+    times, peaks, answers = {}, {}, {}
+    for backend in arrangements.BACKENDS:
+        def count():
+            # Start cold so the shared cache doesn't hide the backend's own cost
+            arrangements.cached_count.cache_clear()
+            return arrangements.count_batch(pairs, backend, workers, chunksize)
+        times[backend] = [timed(count)[1] for _ in range(repeat)]
+        answers[backend], peaks[backend] = traced(count)
+    reference, *others = arrangements.BACKENDS
+    for backend in others:
+        mismatches = [i for i, (a, b) in enumerate(zip(answers[reference], answers[backend])) if a != b]
+        if mismatches:
+            raise ValueError(f'{backend} disagrees with {reference} on records {mismatches[:10]}')
+
+    # Peak memory is only the main process's when the work is on a pool
+    return [{'day': 12,
+             'phase': backend,
+             'size': size,
+             'repeat': repeat,
+             'best': min(times[backend]),
+             'mean': statistics.mean(times[backend]),
+             'worst': max(times[backend]),
+             'peak_memory': peaks[backend],
+             'answer': str(sum(answers[backend])),
+             'throughput': len(pairs) / min(times[backend])}
+            for backend in arrangements.BACKENDS]
+
+
+def benchmark_sweep(size: int, repeat: int, seed: int = 0, workers: int = None,
+                    chunksize: int = None) -> List[Dict]:
+    # Energise a generated day 16 contraption from every edge start with each
+    # engine, on a process pool if workers is given
+    day16 = load_day(16)
+    data = generate(16, size, seed)
+    states = day16.get_starting_states(data)
+    rows = []
+    for engine in ['graph', 'frontier', 'beams']:
+        def sweep():
+            if workers:
+                return day16.sweep(data, states, engine, workers, chunksize)
+            return day16.energise(data, states, engine)
+        times = [timed(sweep)[1] for _ in range(repeat)]
+        counts, peak = traced(sweep)
+        rows.append({'day': 16,
+                     'phase': engine,
+                     'size': size,
+                     'repeat': repeat,
+                     'best': min(times),
+                     'mean': statistics.mean(times),
+                     'worst': max(times),
+                     'peak_memory': peak,
+                     'answer': str(max(counts)),
+                     'throughput': len(states) / min(times)})
+    return rows
+
+
+# How the day 17 search can be run, from plain Dijkstra up
+CRUCIBLE_SEARCHES = {'dijkstra': {'heuristic': None},
+                     'manhattan': {'heuristic': 'manhattan'},
+                     'reverse': {'heuristic': 'reverse'},
+                     'buckets': {'heuristic': 'reverse', 'buckets': True},
+                     'both': {'bidirectional': True}}
+
+
+def benchmark_crucible(size: int, repeat: int, seed: int = 0) -> List[Dict]:
+    # Find the part 2 path across a generated day 17 grid each way, counting
+    # the states each search expands against plain Dijkstra. Every run gets a
+    # fresh graph so the reverse heuristic is paid for each time.
+    day17 = load_day(17)
+    data = generate(17, size, seed)
+    min_run, max_run = day17.RULES[day17.Part.PT2]
+    rows = []
+    for search, options in CRUCIBLE_SEARCHES.items():
+        times = []
+        for _ in range(repeat):
+            graph = day17.parse_input(data)
+            times.append(timed(lambda: graph.find_shortest_path(min_run, max_run, **options))[1])
+        graph = day17.parse_input(data)
+        answer, peak = traced(lambda: graph.find_shortest_path(min_run, max_run, **options))
+        if rows and str(answer) != rows[0]['answer']:
+            raise ValueError(f"{search} found {answer} but dijkstra found {rows[0]['answer']}")
+        rows.append({'day': 17,
+                     'phase': search,
+                     'size': size,
+                     'repeat': repeat,
+                     'best': min(times),
+                     'mean': statistics.mean(times),
+                     'worst': max(times),
+                     'peak_memory': peak,
+                     'answer': str(answer),
+                     'expanded': graph.expanded})
+    return rows
+
+
+def get_commit() -> str:
+    try:
+        # Asked of the repo itself, wherever the benchmark is run from
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def write_report(results: List[Dict], filename: str, report_format: str, metadata: Dict):
+    with open(filename, 'w', newline='') as f:
+        if report_format == 'csv':
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump({**metadata, 'results': results}, f, indent=2)
+
+
+def print_row(row: Dict):
+    print(f"{row['day']:>4} {row['phase']:<9} {row['best']:>10.4f} {row['mean']:>10.4f} "
+          f"{row['peak_memory'] / 1024:>11.1f}" +
+          (f" {row['throughput']:>12.1f}" if 'throughput' in row else '') +
+          (f" {row['expanded']:>10}" if 'expanded' in row else ''), flush=True)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Time the parse, part 1 and part 2 phases of each day.')
+    parser.add_argument('days', nargs='*', type=int, default=DAYS, help='days to run (default: all)')
+    parser.add_argument('--size', type=int, default=50, help='size of the generated inputs')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generated inputs')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per day')
+    parser.add_argument('--input-dir', help='use the real inputs in this directory instead of generating them')
+    parser.add_argument('--circular-list', type=int, metavar='SIZE',
+                        help='benchmark utils.CircularLinkedList with this many elements instead of the days')
+    parser.add_argument('--operations', type=int, default=100_000,
+                        help='jumps and moves made in the circular list benchmark')
+    parser.add_argument('--arrangements', action='store_true',
+                        help='check the day 12 count_arrangements backends against each other and time them')
+    parser.add_argument('--sweep', action='store_true',
+                        help='time each day 16 engine energising the contraption from every edge start')
+    parser.add_argument('--crucible', action='store_true',
+                        help='compare the day 17 searches, counting the states each one expands')
+    parser.add_argument('--workers', type=int,
+                        help='spread the day 12 records or day 16 starts over a process pool of this size')
+    parser.add_argument('--chunksize', type=int, help='records or starts handed to a worker at a time')
+    parser.add_argument('--output', help='write a report to this file')
+    parser.add_argument('--format', choices=['json', 'csv'],
+                        help='report format (default: taken from the output file extension)')
+    args = parser.parse_args(argv)
+
+    print(f"{'day':>4} {'phase':<9} {'best (s)':>10} {'mean (s)':>10} {'peak (KiB)':>11}" +
+          (f" {'per second':>12}" if args.arrangements or args.sweep else '') +
+          (f" {'expanded':>10}" if args.crucible else ''))
+    results = []
+    if args.circular_list:
+        results = benchmark_circular_list(args.circular_list, args.operations, args.repeat, args.seed)
+        [print_row(row) for row in results]
+    if args.arrangements:
+        results = benchmark_arrangements(args.size, args.repeat, args.seed, args.workers, args.chunksize)
+        [print_row(row) for row in results]
+    if args.sweep:
+        results = benchmark_sweep(args.size, args.repeat, args.seed, args.workers, args.chunksize)
+        [print_row(row) for row in results]
+    if args.crucible:
+        results = benchmark_crucible(args.size, args.repeat, args.seed)
+        [print_row(row) for row in results]
+    for day in [] if args.circular_list or args.arrangements or args.sweep or args.crucible else args.days:
+        data = get_input(day, args.size, args.seed, args.input_dir)
+        rows = benchmark_day(day, data, args.size, args.repeat, args.seed)
+        [print_row(row) for row in rows]
+        results.extend(rows)
+
+    if args.output:
+        report_format = args.format or ('csv' if args.output.endswith('.csv') else 'json')
+        metadata = {'commit': get_commit(),
+                    'python': sys.version.split()[0],
+                    'platform': platform.platform(),
+                    'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'input_dir': args.input_dir,
+                    'seed': args.seed}
+        write_report(results, args.output, report_format, metadata)
+
+
+if __name__ == '__main__':
+    main()
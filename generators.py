@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import random
+import string
+from itertools import accumulate
+from typing import Callable, Dict, List
+
+# Each generator builds a valid puzzle input for its day.  `size` is the knob
+# that scales the work - usually the number of lines or the side of the grid -
+# and is clamped where the solver can't cope with an arbitrary value.
+
+
+def day1(size: int, rng: random.Random) -> List[str]:
+    words = ['one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+    lines = []
+    for _ in range(size):
+        pieces = [rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 10))]
+        pieces += [rng.choice(words) for _ in range(rng.randint(0, 3))]
+        pieces += [str(rng.randint(1, 9)) for _ in range(rng.randint(1, 3))]
+        rng.shuffle(pieces)
+        lines.append("".join(pieces))
+    return lines
+
+
+def day2(size: int, rng: random.Random) -> List[str]:
+    lines = []
+    for num in range(1, size + 1):
+        subsets = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(['red', 'green', 'blue'], rng.randint(1, 3))
+            subsets.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {num}: " + "; ".join(subsets))
+    return lines
+
+
+def day3(size: int, rng: random.Random) -> List[str]:
+    size = max(size, 4)
+    lines = []
+    for _ in range(size):
+        line = ''
+        while len(line) < size:
+            roll = rng.random()
+            if roll < 0.15 and len(line) + 3 < size:
+                line += str(rng.randint(1, 999)) + '.'
+            elif roll < 0.2:
+                line += rng.choice('@#$%&*/+=-')
+            else:
+                line += '.'
+        lines.append(line[:size])
+    return lines
+
+
+def day4(size: int, rng: random.Random) -> List[str]:
+    lines = []
+    for num in range(1, size + 1):
+        winning = rng.sample(range(1, 100), 5)
+        matches = rng.randint(0, min(4, size - num))
+        others = rng.sample([n for n in range(1, 100) if n not in winning], 8 - matches)
+        numbers = winning[:matches] + others
+        rng.shuffle(numbers)
+        lines.append(f"Card {num:3d}: " + " ".join(f"{n:2d}" for n in winning) + " | " +
+                     " ".join(f"{n:2d}" for n in numbers))
+    return lines
+
+
+def day5(size: int, rng: random.Random) -> List[str]:
+    top = 2 ** 32
+    seeds = []
+    for _ in range(size):
+        seeds += [rng.randrange(top // 2), rng.randint(1, top // (2 * size))]
+    lines = ["seeds: " + " ".join(str(s) for s in seeds), ""]
+    stages = ['seed', 'soil', 'fertilizer', 'water', 'light', 'temperature', 'humidity', 'location']
+    for source, dest in zip(stages[:-1], stages[1:]):
+        lines.append(f"{source}-to-{dest} map:")
+        breakpoints = sorted(rng.sample(range(top), 2 * size))
+        for start, stop in zip(breakpoints[::2], breakpoints[1::2]):
+            lines.append(f"{rng.randrange(top - (stop - start))} {start} {stop - start}")
+        lines.append("")
+    return lines[:-1]
+
+
+def day6(size: int, rng: random.Random) -> List[str]:
+    # Every time has the same number of digits and every record two fewer
+    # digits than its square, so the concatenated race in part 2 is winnable.
+    digits = max(2, len(str(size)))
+    times = [rng.randint(4 * 10 ** (digits - 1), 10 ** digits - 1) for _ in range(4)]
+    records = [rng.randint(10 ** (2 * digits - 3), 10 ** (2 * digits - 2) - 1) for _ in times]
+    return ["Time:      " + "  ".join(f"{t:>5}" for t in times),
+            "Distance:  " + "  ".join(f"{r:>5}" for r in records)]
+
+
+def day7(size: int, rng: random.Random) -> List[str]:
+    return ["".join(rng.choice('AKQJT98765432') for _ in range(5)) + f" {rng.randint(1, 1000)}"
+            for _ in range(size)]
+
+
+def day8(size: int, rng: random.Random) -> List[str]:
+    # Four ghost loops that each run from a ..A node to a ..Z node and back
+    letters = [c for c in string.ascii_uppercase if c not in 'AZ']
+    names = iter(rng.sample([a + b + c for a in letters for b in letters for c in letters],
+                            size + 24))
+    lines = []
+    for ghost in range(4):
+        length = max(2, min(size // 4, 3000) + rng.randint(0, 3))
+        start = 'AAA' if ghost == 0 else next(names)[:2] + 'A'
+        end = 'ZZZ' if ghost == 0 else next(names)[:2] + 'Z'
+        loop = [start] + [next(names) for _ in range(length - 2)] + [end]
+        for node, following in zip(loop, loop[1:] + loop[1:2]):
+            lines.append(f"{node} = ({following}, {following})")
+    rng.shuffle(lines)
+    return ["".join(rng.choice('LR') for _ in range(20 + size // 10)), ""] + lines
+
+
+def day9(size: int, rng: random.Random) -> List[str]:
+    lines = []
+    for _ in range(size):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 6))]
+        lines.append(" ".join(str(sum(c * x ** p for p, c in enumerate(coefficients)))
+                              for x in range(21)))
+    return lines
+
+
+def day10(size: int, rng: random.Random) -> List[str]:
+    # A serpentine loop: right along the top, snaking back and forth down the
+    # rows between column 1 and a random right edge, then up column 0.
+    size = max(size, 6)
+    rows = (size - 2) // 2 * 2
+    ends = [rng.randint(2, size - 3) for _ in range(rows)]
+    path = [(0, j) for j in range(ends[0] + 1)]
+    for r in range(1, rows):
+        right = ends[r - 1] if r % 2 else ends[r]
+        cols = range(right, 0, -1) if r % 2 else range(1, right + 1)
+        path += [(r, j) for j in cols]
+    path += [(r, 0) for r in range(rows - 1, 0, -1)]
+
+    pipes = {frozenset('NS'): '|', frozenset('EW'): '-', frozenset('NE'): 'L',
+             frozenset('NW'): 'J', frozenset('SW'): '7', frozenset('SE'): 'F'}
+    compass = {(-1, 0): 'N', (1, 0): 'S', (0, 1): 'E', (0, -1): 'W'}
+    grid = [[rng.choice('|-LJ7F..') for _ in range(size)] for _ in range(size)]
+    for ind, (r, c) in enumerate(path):
+        sides = [compass[(pr - r, pc - c)] for pr, pc in [path[ind - 1], path[(ind + 1) % len(path)]]]
+        grid[r + 1][c + 1] = pipes[frozenset(sides)]
+    # S sits on the top edge, with nothing above it that could look connected
+    start = rng.randint(1, ends[0] - 1)
+    grid[1][start + 1], grid[0][start + 1] = 'S', '.'
+    return ["".join(row) for row in grid]
+
+
+def day11(size: int, rng: random.Random) -> List[str]:
+    return ["".join('#' if rng.random() < 0.04 else '.' for _ in range(size)) for _ in range(size)]
+
+
+def day12(size: int, rng: random.Random) -> List[str]:
+    lines = []
+    for _ in range(size):
+        groups = [rng.randint(1, 5) for _ in range(rng.randint(1, 5))]
+        springs = ''
+        for group in groups:
+            springs += '.' * rng.randint(0 if not springs else 1, 3) + '#' * group
+        springs += '.' * rng.randint(0, 3)
+        springs = "".join('?' if rng.random() < 0.5 else c for c in springs)
+        lines.append(f"{springs} {','.join(str(g) for g in groups)}")
+    return lines
+
+
+def day13(size: int, rng: random.Random) -> List[str]:
+    lines = []
+    for _ in range(size):
+        height, width = rng.randint(5, 17), rng.randint(5, 17)
+        half = rng.randint(1, height // 2)
+        rows = ["".join(rng.choice('#.') for _ in range(width)) for _ in range(height - half)]
+        rows = rows[:half][::-1] + rows
+        if rng.random() < 0.5:
+            rows = ["".join(col) for col in zip(*rows)]
+        lines += rows + [""]
+    return lines[:-1]
+
+
+def day14(size: int, rng: random.Random) -> List[str]:
+    return ["".join(rng.choices('O#.', weights=[2, 1, 5])[0] for _ in range(size)) for _ in range(size)]
+
+
+def day15(size: int, rng: random.Random) -> List[str]:
+    labels = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 6)))
+              for _ in range(max(1, size // 4))]
+    steps = [f"{rng.choice(labels)}=" + str(rng.randint(1, 9)) if rng.random() < 0.7 else
+             f"{rng.choice(labels)}-" for _ in range(size)]
+    return [",".join(steps)]
+
+
+def day16(size: int, rng: random.Random) -> List[str]:
+    return ["".join(rng.choices('.|-/\\', weights=[20, 1, 1, 1, 1])[0] for _ in range(size))
+            for _ in range(size)]
+
+
+def day17(size: int, rng: random.Random) -> List[str]:
+    size = max(size, 5)
+    return ["".join(str(rng.randint(1, 9)) for _ in range(size)) for _ in range(size)]
+
+
+def day18(size: int, rng: random.Random) -> List[str]:
+    # A staircase down and to the right, closed off along the bottom and left
+    # edges. Part 1 has to fit on the solver's fixed 1000x1000 grid.
+    steps = max(1, min(size, 200))
+
+    def staircase(longest: int) -> List[tuple]:
+        rights = [rng.randint(2, longest) for _ in range(steps)]
+        downs = [rng.randint(2, longest) for _ in range(steps)]
+        moves = [move for r, d in zip(rights, downs) for move in [('R', r), ('D', d)]]
+        return moves + [('L', sum(rights)), ('U', sum(downs))]
+
+    codes = {'R': 0, 'D': 1, 'L': 2, 'U': 3}
+    small, big = staircase(max(2, 480 // steps)), staircase(0xfffff // steps)
+    return [f"{d} {n} (#{bn:05x}{codes[bd]})" for (d, n), (bd, bn) in zip(small, big)]
+
+
+def day19(size: int, rng: random.Random) -> List[str]:
+    # The workflows form a tree and every condition splits the range that can
+    # reach it in two non-empty pieces
+    workflows = {}
+    names = iter(rng.sample([a + b + c for a in string.ascii_lowercase for b in string.ascii_lowercase
+                             for c in string.ascii_lowercase if a + b + c != 'in'], max(size, 1)))
+
+    def build(name: str, ranges: Dict[str, range]):
+        rules = []
+        for _ in range(rng.randint(1, 3)):
+            variable = rng.choice('xmas')
+            r = ranges[variable]
+            if len(r) < 4:
+                break
+            value = rng.randint(r.start + 1, r.stop - 2)
+            comparison = rng.choice('<>')
+            inside = range(r.start, value) if comparison == '<' else range(value + 1, r.stop)
+            outside = range(value, r.stop) if comparison == '<' else range(r.start, value + 1)
+            target = rng.choice('AR')
+            if len(workflows) < size and rng.random() < 0.7:
+                target = next(names)
+                workflows[target] = None
+                build(target, {**ranges, variable: inside})
+            rules.append(f"{variable}{comparison}{value}:{target}")
+            ranges = {**ranges, variable: outside}
+        if not rules:
+            rules.append(f"x>{ranges['x'].start}:A")
+        workflows[name] = ",".join(rules + [rng.choice('AR')])
+
+    build('in', {v: range(1, 4001) for v in 'xmas'})
+    lines = [f"{name}{{{rules}}}" for name, rules in workflows.items()]
+    rng.shuffle(lines)
+    parts = ["{" + ",".join(f"{v}={rng.randint(1, 4000)}" for v in 'xmas') + "}" for _ in range(size)]
+    return lines + [""] + parts
+
+
+def day20(size: int, rng: random.Random) -> List[str]:
+    # Four binary counters built from flip-flop chains, each watched by a
+    # conjunction feeding the one in front of rx. A chain of n flip-flops
+    # fires every 2**n presses so the width is capped at 12.
+    width = max(2, min(size, 12))
+    chains = [[f"{c}{i}" for i in range(width + rng.randint(-1, 0))] for c in 'abcd']
+    lines = ["broadcaster -> " + ", ".join(chain[0] for chain in chains)]
+    for chain in chains:
+        for module, following in zip(chain, chain[1:]):
+            lines.append(f"%{module} -> {following}")
+        lines.append(f"%{chain[-1]} -> c{chain[0]}")
+        lines.append(f"&c{chain[0]} -> hub")
+    lines.append("&hub -> rx")
+    return lines
+
+
+def day21(size: int, rng: random.Random) -> List[str]:
+    size = max(size, 5) // 2 * 2 + 1
+    middle = size // 2
+    grid = [['#' if rng.random() < 0.1 and middle not in (i, j) else '.' for j in range(size)]
+            for i in range(size)]
+    grid[middle][middle] = 'S'
+    return ["".join(row) for row in grid]
+
+
+def day22(size: int, rng: random.Random) -> List[str]:
+    lines, z = [], 1
+    for _ in range(size):
+        x, y = rng.randint(0, 9), rng.randint(0, 9)
+        length = rng.randint(0, 3)
+        axis = rng.choice('xyz')
+        end = (min(x + length, 9) if axis == 'x' else x,
+               min(y + length, 9) if axis == 'y' else y,
+               z + length if axis == 'z' else z)
+        lines.append(f"{x},{y},{z}~{end[0]},{end[1]},{end[2]}")
+        z = end[2] + rng.randint(1, 3)
+    return lines
+
+
+def day23(size: int, rng: random.Random) -> List[str]:
+    # A lattice of junctions joined by straight corridors, with slopes pointing
+    # down and right next to every junction. Part 2 is exponential in the
+    # number of junctions so the lattice is capped at 5x5.
+    junctions = max(2, min(size, 5))
+    rows = list(accumulate([1] + [rng.randint(3, 7) for _ in range(junctions - 1)]))
+    cols = list(accumulate([1] + [rng.randint(3, 7) for _ in range(junctions - 1)]))
+    grid = [['#'] * (cols[-1] + 2) for _ in range(rows[-1] + 2)]
+    for r in rows:
+        for c in range(cols[0], cols[-1] + 1):
+            grid[r][c] = '.'
+        for c in cols[1:]:
+            grid[r][c - 1] = '>'
+        for c in cols[:-1]:
+            grid[r][c + 1] = '>'
+    for c in cols:
+        for r in range(rows[0], rows[-1] + 1):
+            grid[r][c] = '.'
+        for r in rows[1:]:
+            grid[r - 1][c] = 'v'
+        for r in rows[:-1]:
+            grid[r + 1][c] = 'v'
+    grid[0][1], grid[-1][-2] = '.', '.'
+    return ["".join(row) for row in grid]
+
+
+def day24(size: int, rng: random.Random) -> List[str]:
+    # Every hailstone is on a collision course with one rock thrown from p0 at v0
+    p0 = [rng.randint(2 * 10 ** 14, 4 * 10 ** 14) for _ in range(3)]
+    v0 = [rng.randint(-200, 200) for _ in range(3)]
+    lines = []
+    for t in rng.sample(range(10 ** 11, 10 ** 12), max(size, 5)):
+        v = [rng.choice([n for n in range(-300, 301) if n not in (0, v0[i])]) for i in range(3)]
+        p = [p0[i] + (v0[i] - v[i]) * t for i in range(3)]
+        lines.append(f"{p[0]}, {p[1]}, {p[2]} @ {v[0]}, {v[1]}, {v[2]}")
+    return lines
+
+
+def day25(size: int, rng: random.Random) -> List[str]:
+    # Two well connected halves joined by exactly three wires
+    half = max(5, size // 2)
+    names = rng.sample([a + b + c for a in string.ascii_lowercase for b in string.ascii_lowercase
+                        for c in string.ascii_lowercase], 2 * half)
+    edges = set()
+    for group in [names[:half], names[half:]]:
+        for i, node in enumerate(group):
+            for step in [1, 2]:
+                edges.add((node, group[(i + step) % half]))
+            edges.add((node, rng.choice([n for n in group if n != node])))
+    for left, right in zip(rng.sample(names[:half], 3), rng.sample(names[half:], 3)):
+        edges.add((left, right))
+
+    connections = {}
+    for left, right in edges:
+        if left not in connections.get(right, []):
+            connections.setdefault(left, []).append(right)
+    return [f"{node}: {' '.join(others)}" for node, others in connections.items()]
+
+
+GENERATORS: Dict[int, Callable[[int, random.Random], List[str]]] = {
+    int(name[3:]): func for name, func in list(globals().items()) if name.startswith('day')
+}
+
+
+def generate(day: int, size: int, seed: int = 0) -> List[str]:
+    return GENERATORS[day](size, random.Random(seed))
@@ -1,20 +1,256 @@
 from __future__ import annotations
 
+from array import array
+from collections.abc import Sequence
 from enum import Enum, auto
-from typing import List, Tuple, TypeVar, Union
-from functools import total_ordering
-import numpy as np
+from types import ModuleType
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+from functools import lru_cache
+import bisect
+import heapq
+import importlib
+import importlib.util
+import itertools
+import math
+import mmap
+import os
+import random
 import re
+import sys
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+class LazyModule(ModuleType):
+    # Stands in for a heavy module (numpy, pandas, shapely) and only imports it
+    # the first time one of its attributes is used, so days that never touch it
+    # don't pay for it at start up
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Copy everything across so later lookups never come back through here
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    return LazyModule(name)
+
+
+def process_pool(workers: int, initializer: Callable = None, initargs: Tuple = ()) -> ProcessPoolExecutor:
+    # A pool of worker processes. Importing concurrent.futures pulls in
+    # multiprocessing, which is a noticeable part of start-up, so it's only
+    # paid for here, once a pool is actually wanted.
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+
+
+np = lazy_import('numpy')
 
 T = TypeVar('T')
 LARGE = 1_000_000
 
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DAYS = list(range(1, 26))
+# Day 12 has three solvers; the DFA one is the only one that answers both parts
+DAY_MODULES = {**{day: f'Day{day}' for day in DAYS}, 12: 'Day12-pt2-dfa'}
+
 
 def read_file(file):
     with open(file, 'r') as f:
         return f.read().rstrip('\n').split('\n')
 
 
+class InputFile(Sequence):
+    # A memory-mapped input that behaves like the list of lines read_file
+    # returns, but only decodes a line when it is asked for. Grid days can take
+    # a 2-D uint8 view of the map with no copying at all.
+    def __init__(self, file):
+        with open(file, 'rb') as f:
+            # mmap can't map an empty file
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size \
+                else b''
+        # Like read_file, trailing newlines don't make empty lines
+        self.end = len(self.buffer)
+        while self.end and self.buffer[self.end - 1] == ord('\n'):
+            self.end -= 1
+        self.offsets = array('q', [0])
+        pos = self.buffer.find(b'\n', 0, self.end)
+        while pos != -1:
+            self.offsets.append(pos + 1)
+            pos = self.buffer.find(b'\n', pos + 1, self.end)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, ind: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(ind, slice):
+            return [self[i] for i in range(*ind.indices(len(self)))]
+        if ind < 0:
+            ind += len(self)
+        if not 0 <= ind < len(self):
+            raise IndexError('line index out of range')
+        stop = self.offsets[ind + 1] - 1 if ind + 1 < len(self) else self.end
+        return self.buffer[self.offsets[ind]:stop].decode()
+
+    def grid(self) -> np.ndarray:
+        width = self.offsets[1] - 1 if len(self) > 1 else self.end
+        if any(b - a != width + 1 for a, b in zip(self.offsets, self.offsets[1:])) or \
+                self.end - self.offsets[-1] != width:
+            raise ValueError('input is not rectangular')
+        # Step over the newline at the end of each row rather than copying around it
+        return np.lib.stride_tricks.as_strided(np.frombuffer(self.buffer, dtype=np.uint8),
+                                               shape=(len(self), width), strides=(width + 1, 1),
+                                               writeable=False)
+
+
+def stream_lines(file='-') -> Iterator[str]:
+    # The lines of a file (or stdin for '-') one at a time. Like read_file,
+    # trailing blank lines are dropped, so blank lines are held back until we
+    # know something follows them.
+    f = sys.stdin if file == '-' else open(file, 'r')
+    try:
+        blank_lines = 0
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                blank_lines += 1
+                continue
+            for _ in range(blank_lines):
+                yield ''
+            blank_lines = 0
+            yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def sum_by_line(lines: Iterable[str], parse: Callable, parts: List[Callable]) -> List[int]:
+    # For days where every line adds its own share to the answer: parse and
+    # solve one line at a time so memory stays flat however long the input is
+    totals = [0] * len(parts)
+    for line in lines:
+        parsed = parse([line])
+        for i, part in enumerate(parts):
+            totals[i] += part(parsed)
+    return totals
+
+
+def read_input(file) -> InputFile:
+    return InputFile(file)
+
+
+def char_grid(data: Union[InputFile, List[str]]) -> np.ndarray:
+    # The input as a 2-D array of character codes, e.g. grid == ord('#')
+    if isinstance(data, InputFile):
+        return data.grid()
+    if len({len(line) for line in data}) != 1:
+        raise ValueError('input is not rectangular')
+    return np.frombuffer("".join(data).encode(), dtype=np.uint8).reshape(len(data), -1)
+
+
+class Grid:
+    # A 2-D map held in a single uint8 array, normally of character codes (so
+    # grid.cells == ord('#') is the mask of rocks) but any small values will
+    # do. Positions are (row, col) tuples, or flat indices row * width + col.
+    ORTHOGONAL = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    ALL_AROUND = ORTHOGONAL + ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+    def __init__(self, cells: np.ndarray):
+        self.cells = cells if cells.dtype == np.uint8 else cells.astype(np.uint8)
+
+    @classmethod
+    def from_lines(cls, data: Union[InputFile, List[str]]) -> Grid:
+        # A writable, contiguous copy of the input
+        return cls(np.array(char_grid(data)))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.cells.shape
+
+    @property
+    def height(self) -> int:
+        return self.cells.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.cells.shape[1]
+
+    def __getitem__(self, pos):
+        return self.cells[pos]
+
+    def __setitem__(self, pos, value):
+        self.cells[pos] = value
+
+    def in_bounds(self, pos: Tuple[int, int]) -> bool:
+        return 0 <= pos[0] < self.cells.shape[0] and 0 <= pos[1] < self.cells.shape[1]
+
+    def get(self, pos: Tuple[int, int], default=None):
+        # Unlike indexing, negative positions are off the grid rather than
+        # counted from the far edge
+        return self.cells.item(pos) if self.in_bounds(pos) else default
+
+    def char(self, pos: Tuple[int, int]) -> str:
+        return chr(self.cells.item(pos))
+
+    def find(self, char: str) -> Tuple[int, int]:
+        # The first position holding char
+        ind = int(np.argmax(self.cells == ord(char)))
+        return self.position(ind)
+
+    def index(self, row, col):
+        # Works element-wise on arrays of rows and columns too
+        return row * self.cells.shape[1] + col
+
+    def position(self, ind):
+        return divmod(ind, self.cells.shape[1])
+
+    def neighbors(self, pos: Tuple[int, int], deltas=ORTHOGONAL) -> List[Tuple[int, int]]:
+        return [n for delta in deltas if self.in_bounds(n := (pos[0] + delta[0], pos[1] + delta[1]))]
+
+    def neighbors_of(self, positions: np.ndarray, deltas=ORTHOGONAL) -> Tuple[np.ndarray, np.ndarray]:
+        # The neighbors of an (n, 2) array of positions all at once, as an
+        # (n, len(deltas), 2) array along with an (n, len(deltas)) mask of the
+        # ones on the grid. Neighbors off the grid are clamped to the edge so
+        # the whole array can be used as an index.
+        neighbors = np.asarray(positions)[:, None, :] + np.array(deltas)[None, :, :]
+        on_grid = (neighbors >= 0).all(axis=2) & (neighbors < self.cells.shape).all(axis=2)
+        return np.clip(neighbors, 0, np.array(self.cells.shape) - 1), on_grid
+
+    def rotated(self, k: int = 1) -> Grid:
+        # Rotated k quarter turns anticlockwise; a view, nothing is copied
+        return Grid(np.rot90(self.cells, k=k))
+
+    def transposed(self) -> Grid:
+        return Grid(self.cells.T)
+
+    def copy(self) -> Grid:
+        return Grid(self.cells.copy())
+
+
+def input_path(day: int, input_dir: str = 'input') -> str:
+    return os.path.join(input_dir, f'Day{day}.txt')
+
+
+@lru_cache
+def load_day(day: int) -> ModuleType:
+    # The day scripts aren't a package (and some have dashes in their names) so
+    # load them straight from their files. They go into sys.modules like any
+    # import, which is what lets their functions be pickled over to a pool.
+    name = DAY_MODULES[day].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, f'{DAY_MODULES[day]}.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
 class Part(str, Enum):
     PT1 = auto()
     PT2 = auto()
@@ -33,6 +269,10 @@ class Direction(str, Enum):
     DOWN = auto()
 
 
+# How x and y change moving in each direction (y grows downwards)
+DIRECTION_DELTAS = {Direction.RIGHT: (1, 0), Direction.LEFT: (-1, 0), Direction.UP: (0, -1), Direction.DOWN: (0, 1)}
+
+
 class MapDirection(str, Enum):
     NORTH = 'N'
     SOUTH = 'S'
@@ -55,21 +295,46 @@ class Node:
     def __init__(self, data):
         self.data = data
         self.next = None
+        self.previous = None
 
 
 class LinkedList:
-    def __init__(self):
+    # An ordered container with a tail pointer and an index from each key to
+    # its nodes in list order, so appending, finding, removing and replacing
+    # are all O(1). key(data) gives the key (the data itself by default), so
+    # data must be hashable unless a key is given. The same key can turn up
+    # more than once: find, remove and replace act on the first such node.
+    def __init__(self, items: Iterable = (), key: Callable = None):
         self.head = None
+        self.tail = None
+        self.key = key or (lambda data: data)
+        self.nodes = {}
+        self.size = 0
+        for data in items:
+            self.append(data)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.data
+            current = current.next
+
+    def __contains__(self, data):
+        return self.key(data) in self.nodes
 
     def append(self, data):
         new_node = Node(data)
+        self.nodes.setdefault(self.key(data), []).append(new_node)
+        self.size += 1
         if not self.head:
             self.head = new_node
         else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_node
+            self.tail.next = new_node
+            new_node.previous = self.tail
+        self.tail = new_node
 
     def display(self):
         current = self.head
@@ -79,104 +344,335 @@ class LinkedList:
         print("None")
 
     def find(self, target_data):
-        current = self.head
-        while current:
-            if current.data == target_data:
-                return current
-            current = current.next
-        return None  # Node not found
+        nodes = self.nodes.get(self.key(target_data))
+        return nodes[0] if nodes else None  # None if not found
 
     def remove(self, target_data):
-        current = self.head
-        previous = None
-
-        while current:
-            if current.data == target_data:
-                if previous:
-                    previous.next = current.next
-                else:
-                    self.head = current.next
-                return True  # Node removed successfully
-
-            previous = current
-            current = current.next
+        key = self.key(target_data)
+        nodes = self.nodes.get(key)
+        if not nodes:
+            return False  # Node not found
+        node = nodes.pop(0)
+        if not nodes:
+            del self.nodes[key]
+        self.size -= 1
 
-        return False  # Node not found
+        if node.previous:
+            node.previous.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.previous = node.previous
+        else:
+            self.tail = node.previous
+        return True  # Node removed successfully
 
     def replace(self, target_data, new_data):
         node_to_replace = self.find(target_data)
-        if node_to_replace:
-            node_to_replace.data = new_data
-            return True  # Node replaced successfully
-        else:
+        if not node_to_replace:
             return False  # Node not found
-
-
-class CircularNode:
-    def __init__(self, id: int, value: T):
-        self.id = id
-        self.value = value
-        self.next = None
-        self.previous = None
+        old_key, new_key = self.key(target_data), self.key(new_data)
+        if new_key != old_key:
+            self.nodes[old_key].pop(0)
+            if not self.nodes[old_key]:
+                del self.nodes[old_key]
+            # Slot it in among any nodes already under the new key, which
+            # means counting those before it (a walk, but only for duplicates)
+            earlier, current = 0, node_to_replace.previous
+            if new_key in self.nodes:
+                while current:
+                    earlier += self.key(current.data) == new_key
+                    current = current.previous
+            self.nodes.setdefault(new_key, []).insert(earlier, node_to_replace)
+        node_to_replace.data = new_data
+        return True  # Node replaced successfully
+
+
+NIL = -1
 
 
 class CircularLinkedList:
-    def __init__(self, elements: Union[str, List[T]]):
-        self.nodes = [CircularNode(i, ele) for i, ele in enumerate(elements)]
-        self.head = self.nodes[0]
-        self.tail = self.nodes[len(self.nodes) - 1]
-        self.current = self.head
-        for i in range(len(self.nodes)):
-            self.current.next = self.nodes[i + 1] if i < len(self.nodes) - 1 else self.head
-            self.current = self.current.next
-        self.current = self.tail
-        for i in range(len(self.nodes) - 1, -1, -1):
-            self.current.previous = self.nodes[i - 1] if i > 0 else self.tail
-            self.current = self.current.previous
-        self.current = self.head
+    # A ring of elements held in flat arrays, with each element referred to by
+    # its index in the original sequence (its id). The next and previous
+    # arrays give O(1) steps and splices. The same ids also form an implicit
+    # treap (a randomly balanced binary tree ordered by position round the
+    # ring, with subtree sizes), so finding the element any distance away,
+    # or where an element sits, takes O(log n) rather than a walk.
+    def __init__(self, elements: Union[str, List[T]], seed: int = 0):
+        self.values = list(elements)
+        n = len(self.values)
+        self.next = array('i', range(1, n + 1))
+        self.previous = array('i', range(-1, n - 1))
+        self.next[n - 1], self.previous[0] = 0, n - 1
+        self.current = 0
+
+        rng = random.Random(seed)
+        self.priority = array('i', (rng.getrandbits(31) for _ in range(n)))
+        self.left = array('i', [NIL]) * n
+        self.right = array('i', [NIL]) * n
+        self.parent = array('i', [NIL]) * n
+        self.size = array('i', [1]) * n
+        self.root = self.__build()
+
+    def __build(self) -> int:
+        # Build the treap in one pass: each new element goes on the right
+        # spine, taking over any lower priority elements as its left subtree.
+        # An element's subtree is complete once it leaves the spine.
+        spine = []
+        for i in range(len(self.values)):
+            last = NIL
+            while spine and self.priority[spine[-1]] < self.priority[i]:
+                last = spine.pop()
+                self.__update(last)
+            self.left[i] = last
+            if spine:
+                self.right[spine[-1]] = i
+            spine.append(i)
+        root = spine[0] if spine else NIL
+        while spine:
+            self.__update(spine.pop())
+        return root
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        # Round the ring once, starting from the current element
+        node = self.current
+        for _ in range(len(self.values)):
+            yield self.values[node]
+            node = self.next[node]
+
+    def __size(self, node: int) -> int:
+        return self.size[node] if node != NIL else 0
+
+    def __update(self, node: int):
+        left, right = self.left[node], self.right[node]
+        self.size[node] = 1 + self.__size(left) + self.__size(right)
+        if left != NIL:
+            self.parent[left] = node
+        if right != NIL:
+            self.parent[right] = node
+
+    def __split(self, node: int, k: int) -> Tuple[int, int]:
+        # The first k elements under node, and the rest
+        if node == NIL:
+            return NIL, NIL
+        if self.__size(self.left[node]) < k:
+            first, rest = self.__split(self.right[node], k - self.__size(self.left[node]) - 1)
+            self.right[node] = first
+            self.__update(node)
+            self.parent[node] = NIL
+            return node, rest
+        first, rest = self.__split(self.left[node], k)
+        self.left[node] = rest
+        self.__update(node)
+        self.parent[node] = NIL
+        return first, node
+
+    def __merge(self, first: int, second: int) -> int:
+        if first == NIL or second == NIL:
+            return first if second == NIL else second
+        if self.priority[first] > self.priority[second]:
+            self.right[first] = self.__merge(self.right[first], second)
+            self.__update(first)
+            return first
+        self.left[second] = self.__merge(first, self.left[second])
+        self.__update(second)
+        return second
+
+    def position(self, node: int) -> int:
+        # How far round the ring node is from the start of the treap order
+        pos = self.__size(self.left[node])
+        while self.parent[node] != NIL:
+            if self.right[self.parent[node]] == node:
+                pos += self.__size(self.left[self.parent[node]]) + 1
+            node = self.parent[node]
+        return pos
+
+    def node_at(self, pos: int) -> int:
+        node, pos = self.root, pos % len(self.values)
+        while True:
+            left_size = self.__size(self.left[node])
+            if pos < left_size:
+                node = self.left[node]
+            elif pos == left_size:
+                return node
+            else:
+                pos -= left_size + 1
+                node = self.right[node]
 
     def get_next(self):
-        val = self.current.value
-        self.current = self.current.next
+        val = self.values[self.current]
+        self.current = self.next[self.current]
         return val
 
-    def get_node(self, num: int):
+    def get_node(self, num: int) -> int:
+        # The element num steps on from the current one (back if negative)
         if num == 0:
             return self.current
-        current = self.current
-        for _ in range(abs(num)):
-            self.current = self.current.next if num > 0 else self.current.previous
-        node = self.current
-        self.current = current
-        return node
+        return self.get_node_from(self.current, num)
+
+    def get_node_from(self, node: int, num: int) -> int:
+        return self.node_at(self.position(node) + num)
+
+    def move_after(self, node: int, target: int):
+        # Take node out of the ring and put it straight after target
+        if node == target:
+            return
+        self.next[self.previous[node]] = self.next[node]
+        self.previous[self.next[node]] = self.previous[node]
+        self.previous[node], self.next[node] = target, self.next[target]
+        self.previous[self.next[target]] = node
+        self.next[target] = node
+
+        first, rest = self.__split(self.root, self.position(node))
+        _, rest = self.__split(rest, 1)
+        self.root = self.__merge(first, rest)
+        self.left[node] = self.right[node] = self.parent[node] = NIL
+        self.size[node] = 1
+        first, rest = self.__split(self.root, self.position(target) + 1)
+        self.root = self.__merge(self.__merge(first, node), rest)
+        self.parent[self.root] = NIL
+
+    def move(self, node: int, steps: int):
+        # Shift node steps places round the ring (back if negative). The others
+        # close up behind it, so a full lap is len - 1 steps.
+        if len(self.values) < 3:
+            return
+        steps %= len(self.values) - 1
+        if steps:
+            self.move_after(node, self.get_node_from(node, steps))
+
+
+class IntervalSet:
+    # A set of integers stored as sorted, disjoint, non-touching half-open
+    # intervals [start, stop). The set operations sweep both sorted lists
+    # together, so combining sets of K and M intervals is O(K + M).
+    def __init__(self, intervals: Iterable[Union[range, Tuple[int, int]]] = ()):
+        self.intervals: List[Tuple[int, int]] = []
+        for start, stop in sorted((r.start, r.stop) if isinstance(r, range) else tuple(r) for r in intervals):
+            if start >= stop:
+                continue
+            if self.intervals and start <= self.intervals[-1][1]:
+                self.intervals[-1] = (self.intervals[-1][0], max(stop, self.intervals[-1][1]))
+            else:
+                self.intervals.append((start, stop))
 
+    @classmethod
+    def from_sorted(cls, intervals: List[Tuple[int, int]]) -> IntervalSet:
+        # For intervals that are already sorted, disjoint and non-touching
+        interval_set = cls()
+        interval_set.intervals = intervals
+        return interval_set
 
-@total_ordering
-class EnhancedRange:
-    def __init__(self, r: range):
-        self.r = r
+    def __iter__(self):
+        return iter(self.intervals)
 
-    def contains(self, other):
-        return True if self.r[0] <= other.r[0] and self.r[-1] >= other.r[-1] else False
+    def __len__(self):
+        return len(self.intervals)
 
-    def overlaps(self, other):
-        rs = [self.r, other.r]
-        rs.sort(key=lambda r: r[0])
-        return True if rs[0][-1] >= rs[1][0] else False
+    def __bool__(self):
+        return bool(self.intervals)
 
-    def combine(self, other):
-        if not self.overlaps(other):
-            raise ValueError('ranges do not overlap')
-        return EnhancedRange(range(min([self.r[0], other.r[0]]), max([self.r[-1]+1, other.r[-1]+1])))
+    def __eq__(self, other):
+        return self.intervals == other.intervals
 
-    def __lt__(self, other):
-        return True if self.r[0] < other.r[0] or self.r[0] == other.r[0] and self.r[-1] < other.r[-1] else False
+    def __repr__(self):
+        return f'IntervalSet({self.intervals})'
 
-    def __eq__(self, other):
-        return self.r[0] == other.r[0] and self.r[-1] == other.r[-1]
+    def __contains__(self, num: int) -> bool:
+        ind = bisect.bisect_right(self.intervals, (num, math.inf)) - 1
+        return ind >= 0 and num < self.intervals[ind][1]
+
+    @property
+    def start(self) -> int:
+        return self.intervals[0][0]
+
+    @property
+    def stop(self) -> int:
+        return self.intervals[-1][1]
+
+    @property
+    def size(self) -> int:
+        return sum(stop - start for start, stop in self.intervals)
+
+    def ranges(self) -> List[range]:
+        return [range(start, stop) for start, stop in self.intervals]
+
+    def union(self, other: IntervalSet) -> IntervalSet:
+        return IntervalSet(self.intervals + other.intervals)
+
+    def intersection(self, other: IntervalSet) -> IntervalSet:
+        result = []
+        i, j = 0, 0
+        while i < len(self.intervals) and j < len(other.intervals):
+            start = max(self.intervals[i][0], other.intervals[j][0])
+            stop = min(self.intervals[i][1], other.intervals[j][1])
+            if start < stop:
+                result.append((start, stop))
+            # Move past whichever interval finishes first
+            if self.intervals[i][1] < other.intervals[j][1]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet.from_sorted(result)
+
+    def difference(self, other: IntervalSet) -> IntervalSet:
+        result = []
+        j = 0
+        for start, stop in self.intervals:
+            while j < len(other.intervals) and other.intervals[j][1] <= start:
+                j += 1
+            k = j
+            while start < stop and k < len(other.intervals) and other.intervals[k][0] < stop:
+                if start < other.intervals[k][0]:
+                    result.append((start, other.intervals[k][0]))
+                start = max(start, other.intervals[k][1])
+                k += 1
+            if start < stop:
+                result.append((start, stop))
+        return IntervalSet.from_sorted(result)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def shift(self, offset: int) -> IntervalSet:
+        return IntervalSet.from_sorted([(start + offset, stop + offset) for start, stop in self.intervals])
+
+    def translate(self, rules: List[Tuple[int, int, int]]) -> IntervalSet:
+        # Each rule is (start, stop, offset): the part of the set inside
+        # [start, stop) moves by offset and anything no rule covers stays put.
+        # The rules mustn't overlap. One sweep over the intervals and rules.
+        rules = sorted(rules)
+        pieces = []
+        j = 0
+        for start, stop in self.intervals:
+            while j < len(rules) and rules[j][1] <= start:
+                j += 1
+            k, pos = j, start
+            while pos < stop:
+                if k == len(rules) or rules[k][0] >= stop:
+                    pieces.append((pos, stop))
+                    break
+                rule_start, rule_stop, offset = rules[k]
+                if pos < rule_start:
+                    pieces.append((pos, rule_start))
+                    pos = rule_start
+                end = min(stop, rule_stop)
+                pieces.append((pos + offset, end + offset))
+                pos = end
+                # A rule running past this interval may cover the next one too
+                if rule_stop <= stop:
+                    k += 1
+            j = k
+        return IntervalSet(pieces)
 
 
 class XYPair:
+    __slots__ = ('x', 'y')
+
     def __init__(self, xypair: Tuple[int, int]):
         self.x = xypair[0]
         self.y = xypair[1]
@@ -190,9 +686,7 @@ class XYPair:
         self.y = xypair.y
 
     def swap(self):
-        temp = self.x
-        self.x = self.y
-        self.y = temp
+        self.x, self.y = self.y, self.x
         return self
 
     def manhattan(self, other):
@@ -203,14 +697,13 @@ class XYPair:
         return f'{self.x}-{self.y}'
 
     def move(self, direction: Direction):
-        self.x += 1 if direction == Direction.RIGHT else -1 if direction == Direction.LEFT else 0
-        self.y += 1 if direction == Direction.DOWN else -1 if direction == Direction.UP else 0
+        dx, dy = DIRECTION_DELTAS[direction]
+        self.x += dx
+        self.y += dy
 
     def get_neighbor(self, direction: Direction) -> XYPair:
-        return XYPair((self.x - 1, self.y)) if direction == Direction.LEFT else \
-            XYPair((self.x + 1, self.y)) if direction == Direction.RIGHT else \
-            XYPair((self.x, self.y - 1)) if direction == Direction.UP else \
-            XYPair((self.x, self.y + 1))
+        dx, dy = DIRECTION_DELTAS[direction]
+        return XYPair((self.x + dx, self.y + dy))
 
     def get_inclusive_points_to(self, other: XYPair):
         if not( self.x == other.x or self.y == other.y):
@@ -232,10 +725,13 @@ class XYPair:
         return True if self.x == other.x and self.y == other.y else False
 
     def __hash__(self):
-        return hash(self.x) + hash(self.y)
+        # Hash the tuple so that (1, 2) and (2, 1) don't collide
+        return hash((self.x, self.y))
 
 
 class XYZ:
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, xyz: Tuple[int, int, int]):
         self.x = xyz[0]
         self.y = xyz[1]
@@ -261,12 +757,231 @@ class XYZ:
         return True if self.x == other.x and self.y == other.y and self.z == other.z else False
 
     def __hash__(self):
-        return hash(self.x) + hash(self.y) + hash(self.z)
+        return hash((self.x, self.y, self.z))
 
     def manhattan(self, other):
         return abs(self.x - other.x) + abs(self.y - other.y) + abs(self.z - other.z)
 
 
+# The batch forms work on arrays of points, one point per row (x, y or x, y, z)
+def points_array(points: Iterable[Union[XYPair, XYZ]]) -> np.ndarray:
+    return np.array([point.coordinates for point in points])
+
+
+def manhattan_distances(points: np.ndarray, others: np.ndarray) -> np.ndarray:
+    # Broadcasts like any numpy operation, so points[:, None] against
+    # points[None, :] gives the distance between every pair
+    return np.abs(np.asarray(points) - np.asarray(others)).sum(axis=-1)
+
+
+def neighboring_points(points: np.ndarray, directions: Iterable[Direction] = tuple(Direction)) -> np.ndarray:
+    # For an (n, 2) array of x, y points, their neighbors in each direction as
+    # an (n, len(directions), 2) array
+    deltas = np.array([DIRECTION_DELTAS[direction] for direction in directions])
+    return np.asarray(points)[:, None, :] + deltas[None, :, :]
+
+
+class BucketQueue:
+    # The priority queue of Dial's algorithm: a ring of span buckets, one per
+    # priority. Priorities must be whole numbers, and nothing can be pushed
+    # span or more past the lowest priority still waiting (or below it).
+    def __init__(self, span: int):
+        self.span = span
+        self.buckets = [[] for _ in range(span)]
+        self.priority = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, priority: int, item):
+        if self.priority is None or priority < self.priority:
+            self.priority = priority
+        self.buckets[priority % self.span].append(item)
+        self.size += 1
+
+    def pop(self):
+        while not self.buckets[self.priority % self.span]:
+            self.priority += 1
+        self.size -= 1
+        return self.buckets[self.priority % self.span].pop()
+
+
+def dijkstra(sources: Iterable[Hashable], neighbors: Callable[[Hashable], Iterable[Tuple[Hashable, int]]],
+             is_target: Callable[[Hashable], bool], heuristic: Callable[[Hashable], int] = None,
+             span: int = None) -> Optional[int]:
+    # Cheapest cost from any of the sources to the first node is_target accepts,
+    # or None if there isn't one. Nodes can be anything hashable and
+    # neighbors(node) gives (neighbor, cost) pairs, so the graph never has to be
+    # built. With an admissible heuristic (one that never overestimates the
+    # cost left) this is A*. With whole-number costs, span switches the heap
+    # for a BucketQueue, which needs a consistent heuristic and no step that
+    # raises the priority (cost plus heuristic) by span or more.
+    heuristic = heuristic or (lambda node: 0)
+    if span:
+        queue = BucketQueue(span)
+        push, pop = queue.push, queue.pop
+    else:
+        queue = []
+        # The counter breaks ties so nodes never need comparing
+        counter = itertools.count()
+
+        def push(priority: int, item: Tuple[int, Hashable]):
+            heapq.heappush(queue, (priority, next(counter), item))
+
+        def pop() -> Tuple[int, Hashable]:
+            return heapq.heappop(queue)[2]
+
+    costs = {}
+    for source in sources:
+        costs[source] = 0
+        push(heuristic(source), (0, source))
+
+    while queue:
+        cost, node = pop()
+        if cost > costs[node]:
+            continue
+        if is_target(node):
+            return cost
+        for neighbor, edge_cost in neighbors(node):
+            new_cost = cost + edge_cost
+            if new_cost < costs.get(neighbor, math.inf):
+                costs[neighbor] = new_cost
+                push(new_cost + heuristic(neighbor), (new_cost, neighbor))
+    return None
+
+
+class CSRGraph:
+    # A weighted directed graph on the nodes 0..n-1 with its adjacency in
+    # compressed sparse row form: the edges out of node u go to
+    # targets[offsets[u]:offsets[u + 1]] and cost the matching weights.
+    # Weights can't be negative.
+    def __init__(self, offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.weights = np.asarray(weights)
+        if (self.weights < 0).any():
+            raise ValueError('edge weights must not be negative')
+        # The search loops read single elements, which is much quicker from lists
+        self.adjacency = [list(zip(self.targets[start:stop].tolist(), self.weights[start:stop].tolist()))
+                          for start, stop in zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist())]
+
+    @classmethod
+    def from_edges(cls, num_nodes: int, edges: Iterable[Tuple[int, int, int]]) -> CSRGraph:
+        edges = np.array(list(edges)).reshape(-1, 3)
+        sources = edges[:, 0].astype(np.int64)
+        order = np.argsort(sources, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=num_nodes))))
+        return cls(offsets, edges[order, 1], edges[order, 2])
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, missing=LARGE) -> CSRGraph:
+        # Entries equal to missing (and the diagonal) aren't edges
+        matrix = np.asarray(matrix)
+        present = matrix != missing
+        np.fill_diagonal(present, False)
+        sources, targets = np.nonzero(present)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=matrix.shape[0]))))
+        return cls(offsets, targets, matrix[sources, targets])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.offsets) - 1
+
+    def neighbors(self, node: int) -> List[Tuple[int, int]]:
+        return self.adjacency[node]
+
+    def shortest_path(self, source: int, targets: Iterable[int] = None,
+                      heuristic: Callable[[int], int] = None) -> Tuple[float, Optional[int]]:
+        # The cost to the nearest of the targets and which target that was,
+        # stopping as soon as it is reached; (inf, None) if none can be reached
+        targets = set(targets) if targets is not None else set(range(self.num_nodes))
+        heuristic = heuristic or (lambda node: 0)
+        costs = [math.inf] * self.num_nodes
+        costs[source] = 0
+        queue = [(heuristic(source), 0, source)]
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+            if node in targets:
+                return cost, node
+            for neighbor, weight in self.adjacency[node]:
+                new_cost = cost + weight
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost + heuristic(neighbor), new_cost, neighbor))
+        return math.inf, None
+
+    def distances(self, source: int) -> List[float]:
+        # The cost from source to every node (inf where there's no way there)
+        costs = [math.inf] * self.num_nodes
+        costs[source] = 0
+        queue = [(0, source)]
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if cost > costs[node]:
+                continue
+            for neighbor, weight in self.adjacency[node]:
+                new_cost = cost + weight
+                if new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    heapq.heappush(queue, (new_cost, neighbor))
+        return costs
+
+    def all_pairs(self, sources: Iterable[int] = None, workers: int = None) -> np.ndarray:
+        # One Dijkstra per source (weights are never negative so Johnson's
+        # reweighting buys nothing), spread over a process pool if asked
+        sources = list(sources) if sources is not None else list(range(self.num_nodes))
+        if workers:
+            with process_pool(workers) as executor:
+                rows = list(executor.map(self.distances, sources,
+                                         chunksize=max(1, len(sources) // (4 * workers))))
+        else:
+            rows = [self.distances(source) for source in sources]
+        return np.array(rows, dtype=float).reshape(len(sources), self.num_nodes)
+
+    def components(self) -> List[int]:
+        # The strongly connected component of each node (Tarjan's algorithm,
+        # without recursion). Components are numbered in the order they're
+        # finished, so every edge leads to a component with the same or a
+        # lower number and a single pass from 0 up sees successors first.
+        index, low = [-1] * self.num_nodes, [0] * self.num_nodes
+        component = [-1] * self.num_nodes
+        stack, counter, num_components = [], 0, 0
+        for root in range(self.num_nodes):
+            if index[root] >= 0:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            work = [(root, iter(self.adjacency[root]))]
+            while work:
+                node, edges = work[-1]
+                for neighbor, _ in edges:
+                    if index[neighbor] < 0:
+                        index[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        work.append((neighbor, iter(self.adjacency[neighbor])))
+                        break
+                    if component[neighbor] < 0:
+                        low[node] = min(low[node], index[neighbor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            component[member] = num_components
+                            if member == node:
+                                break
+                        num_components += 1
+        return component
+
+
 class GraphNode:
     def __init__(self, id: int, adj_list: List[int]):
         self.id = id
@@ -279,53 +994,27 @@ class Graph:
         self.nodes = nodes
         self.edge_costs = edge_costs
         self.shortest_paths = edge_costs.copy()
-        self.current_cost = 0
-        self.visited = List[GraphNode]
+        self.nodes_by_id = {n.id: n for n in nodes}
 
     @property
     def num_nodes(self):
         return len(self.nodes)
 
-    @property
-    def unvisited_nodes(self):
-        unvisited = [n for n in self.nodes if n not in self.visited]
-        unvisited.sort(key=lambda n: n.cost)
-        return unvisited
-
     def get_node(self, id: int):
-        return next(iter(n for n in self.nodes if n.id == id))
-
-    def find_all_shortest_paths(self):
-        for n in self.nodes:
-            self.__find_shortest_paths(n)
-
-    def __find_shortest_paths(self, starting_node: GraphNode):
-        self.visited, self.current_cost = [], 0
-        for n in self.nodes:
-            n.cost = LARGE
-        current = starting_node
-        current.cost = 0
-
-        done = False
-        while not done:
-            neighbors = self.__get_unvisited_neighbors(current)
-            self.__update_costs_for_neighbors(current, neighbors)
-            self.visited.append(current)
-            if not len(self.visited) == self.num_nodes:
-                current = self.unvisited_nodes[0]
-            else:
-                done = True
-        for n in self.nodes:
-            self.shortest_paths[starting_node.id, n.id] = n.cost
-            self.shortest_paths[n.id, starting_node.id] = n.cost
-
-    def __get_unvisited_neighbors(self, current: GraphNode) -> List[GraphNode]:
-        return [self.get_node(i) for i in current.adj_list if self.get_node(i) not in self.visited]
-
-    def __update_costs_for_neighbors(self, current: GraphNode, neighbors: List[GraphNode]):
-        for neighbor in neighbors:
-            neighbor.cost = min(neighbor.cost,
-                                current.cost + self.edge_costs[current.id, neighbor.id])
+        return self.nodes_by_id[id]
+
+    def find_all_shortest_paths(self, workers: int = None):
+        # Node ids index edge_costs directly
+        edges = [(n.id, i, self.edge_costs[n.id, i]) for n in self.nodes for i in n.adj_list]
+        csr = CSRGraph.from_edges(self.edge_costs.shape[0], edges)
+        ids = [n.id for n in self.nodes]
+        costs = csr.all_pairs(ids, workers)[:, ids]
+        costs[np.isinf(costs)] = LARGE
+        for n, row in zip(self.nodes, costs):
+            self.shortest_paths[n.id, ids] = row
+            self.shortest_paths[ids, n.id] = row
+        for n, cost in zip(self.nodes, costs[-1] if len(costs) else []):
+            n.cost = cost.item()
 
 
 class CharRemover:
@@ -350,22 +1039,3 @@ def find_exact_match(number, input_string):
 
     match = next(matches, None)  # Get the desired occurrence
     return match.start() if match else None
-
-
-def left(r1: range, r2: range) -> Union[range, None]:
-    if r1.start < r2.start:
-        return range(r1.start, min(r1.stop, r2.start))
-
-
-def right(r1: range, r2: range) -> Union[range, None]:
-    if r1.stop > r2.stop:
-        return range(max(r1.start, r2.stop), r1.stop)
-
-
-def middle(r1: range, r2: range) -> Union[range, None]:
-    if r1.start <= r2.start <= r1.stop or r2.start <= r1.start <= r2.stop:
-        return range(max(r1.start, r2.start), min(r1.stop, r2.stop))
-
-
-def get_range_intersection(r1: range, r2: range) -> (range, range, range):
-    return left(r1, r2), middle(r1, r2), right(r1, r2)
\ No newline at end of file